@@ -8,7 +8,21 @@ from app.models.user import User
 from app.models.document import Document
 from app.models.chunk import DocumentChunk
 from app.models.scrape_source import ScrapeSource
+from app.models.extraction_stat import ExtractionStat
 from app.admin.scraper import scrape_all_sources
+from app.document.embedder import get_load_stats, query_batcher
+from app.document.query_cache import query_cache
+from app.document.extraction_cache import extraction_cache
+from app.document.results_store import delete_result_records
+from app.chat.intent_router import answer_path_stats
+from app.document.faiss_manager import (
+    get_persistence_stats,
+    index_lock,
+    remove_vectors,
+    compact_index,
+    get_vector_counts,
+    live_vector_ids,
+)
 
 
 router = APIRouter()
@@ -51,6 +65,33 @@ def get_stats(
     }
 
 
+# =====================================================
+# Performance Metrics
+# =====================================================
+
+@router.get("/metrics")
+def get_metrics(
+    user=Depends(admin_required)
+):
+    return {
+        "embedder": get_load_stats(),
+        "query_batcher": query_batcher.get_stats(),
+        "query_cache": query_cache.get_stats(),
+        "extraction_cache": extraction_cache.get_stats(),
+        "answer_paths": answer_path_stats.get_stats(),
+        "faiss_persistence": get_persistence_stats(),
+        "faiss_lock": index_lock.get_stats(),
+    }
+
+
+@router.delete("/metrics/query-cache")
+def clear_query_cache(
+    user=Depends(admin_required)
+):
+    query_cache.clear()
+    return {"message": "Query embedding cache cleared"}
+
+
 # =====================================================
 # Documents
 # =====================================================
@@ -75,6 +116,31 @@ def list_documents(
     ]
 
 
+@router.get("/documents/{doc_id}/extraction")
+def get_extraction_stats(
+    doc_id: int,
+    db: Session = Depends(get_db),
+    user=Depends(admin_required)
+):
+    stats = db.query(ExtractionStat).filter(
+        ExtractionStat.document_id == doc_id
+    ).order_by(ExtractionStat.created_at.desc()).all()
+
+    return [
+        {
+            "pages_total": stat.pages_total,
+            "pages_text": stat.pages_text,
+            "pages_ocr": stat.pages_ocr,
+            "ocr_seconds": stat.ocr_seconds,
+            "used_ghostscript": stat.used_ghostscript,
+            "ghostscript_seconds": stat.ghostscript_seconds,
+            "cache_hit": stat.cache_hit,
+            "created_at": stat.created_at,
+        }
+        for stat in stats
+    ]
+
+
 @router.delete("/documents/{doc_id}")
 def delete_document(
     doc_id: int,
@@ -86,7 +152,15 @@ def delete_document(
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    # delete chunks first
+    chunk_ids = [
+        chunk_id for (chunk_id,) in db.query(DocumentChunk.id).filter(
+            DocumentChunk.document_id == doc_id
+        ).all()
+    ]
+
+    # delete structured result rows and chunks first
+    delete_result_records(db, doc_id)
+
     db.query(DocumentChunk).filter(
         DocumentChunk.document_id == doc_id
     ).delete()
@@ -94,7 +168,48 @@ def delete_document(
     db.delete(document)
     db.commit()
 
-    return {"message": "Document deleted successfully"}
+    # After the commit: a failure here leaves orphan vectors, which
+    # /admin/index/compact cleans up
+    removed = remove_vectors(chunk_ids)
+
+    return {
+        "message": "Document deleted successfully",
+        "vectors_removed": removed,
+    }
+
+
+# =====================================================
+# FAISS Index Maintenance
+# =====================================================
+
+@router.post("/index/compact")
+def compact_faiss_index(
+    db: Session = Depends(get_db),
+    user=Depends(admin_required)
+):
+    """
+    Remove vectors whose chunk rows no longer exist (documents deleted
+    before deletes reached the index), then rebuild without tombstones.
+    """
+
+    before = get_vector_counts()
+
+    # Vectors first: chunk rows are committed before their vectors are
+    # added, so a vector is only an orphan if its row is gone after the
+    # vector was seen (reading rows first would drop in-flight ingestion)
+    vector_ids = live_vector_ids()
+    chunk_ids = {chunk_id for (chunk_id,) in db.query(DocumentChunk.id).all()}
+    orphans = [int(i) for i in vector_ids if int(i) not in chunk_ids]
+
+    # Compacted right below — no background compaction racing it
+    remove_vectors(orphans, compact=False)
+    compact_index()
+
+    return {
+        "orphans_removed": len(orphans),
+        "before": before,
+        "after": get_vector_counts(),
+    }
 
 
 # =====================================================
@@ -1,17 +1,21 @@
 import os
 import requests
-import hashlib
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from sqlalchemy.orm import Session
 
-from app.document.processing import process_document
+from app.document.processing import process_document, reprocess_document
 from app.models.document import Document
 from app.database import SessionLocal
 from app.models.scrape_source import ScrapeSource
 from app.models.user import User
+from app.utils.files import (
+    stream_to_temp_file,
+    FileTooLargeError,
+    STREAM_BLOCK_SIZE,
+)
 
 
 UPLOAD_DIR = "data"
@@ -23,6 +27,7 @@ HEADERS = {
 
 MAX_WORKERS = 5
 MAX_FILE_SIZE_MB = 20
+MAX_FILE_SIZE_BYTES = MAX_FILE_SIZE_MB * 1024 * 1024
 
 
 # =====================================================
@@ -57,17 +62,33 @@ def extract_pdf_links(url: str):
 def handle_single_pdf(pdf_url, user_id):
 
     db = SessionLocal()
+    temp_path = None
 
     try:
         print(f"[SCRAPER] Checking: {pdf_url}")
 
-        response = requests.get(pdf_url, headers=HEADERS, timeout=30)
+        response = requests.get(pdf_url, headers=HEADERS, timeout=30, stream=True)
         if response.status_code != 200:
             print("[SCRAPER] Failed download:", pdf_url)
             return False
 
-        file_bytes = response.content
-        file_hash = hashlib.sha256(file_bytes).hexdigest()
+        content_length = int(response.headers.get("Content-Length") or 0)
+        if content_length > MAX_FILE_SIZE_BYTES:
+            print("[SCRAPER] Skipping oversized file:", pdf_url)
+            return False
+
+        # Stream to a temp file, hashing as we go (bounded memory)
+        try:
+            temp_path, file_hash, _ = stream_to_temp_file(
+                response.iter_content(chunk_size=STREAM_BLOCK_SIZE),
+                UPLOAD_DIR,
+                MAX_FILE_SIZE_BYTES
+            )
+        except FileTooLargeError:
+            print("[SCRAPER] Skipping oversized file:", pdf_url)
+            return False
+        finally:
+            response.close()
 
         existing = db.query(Document).filter(
             Document.source_url == pdf_url
@@ -85,13 +106,17 @@ def handle_single_pdf(pdf_url, user_id):
                 db.commit()
                 return False
 
-            # File updated → reprocess
+            # File updated → write new bytes, re-ingest only changed chunks
             print("[SCRAPER] File updated. Reprocessing:", pdf_url)
 
+            os.replace(temp_path, existing.file_path)
+            temp_path = None
+
             existing.file_hash = file_hash
             db.commit()
 
-            process_document(existing.file_path, "pdf", existing.id)
+            result = reprocess_document(existing.file_path, "pdf", existing.id)
+            print("[SCRAPER] Re-ingest result:", result)
             return True
 
         # -------------------------------------------------
@@ -101,8 +126,8 @@ def handle_single_pdf(pdf_url, user_id):
         filename = pdf_url.split("/")[-1]
         file_path = os.path.join(UPLOAD_DIR, filename)
 
-        with open(file_path, "wb") as f:
-            f.write(file_bytes)
+        os.replace(temp_path, file_path)
+        temp_path = None
 
         new_doc = Document(
             filename=filename,
@@ -133,6 +158,9 @@ def handle_single_pdf(pdf_url, user_id):
         return False
 
     finally:
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+
         db.close()
 
 
@@ -0,0 +1,367 @@
+import os
+import re
+
+from sqlalchemy import func, case
+
+from app.models.document import Document
+from app.models.student_result import StudentResult, SubjectMark
+from app.document.results_store import parse_semester
+
+
+ANALYTICS_TOP_N = int(os.getenv("ANALYTICS_TOP_N", "10"))
+
+
+# =====================================================
+# QUESTION PATTERNS
+# =====================================================
+
+QUESTION_SEMESTER_RE = re.compile(r"\bsem(?:ester)?\s*[- ]?\s*(\d{1,2}|[ivx]{1,4})\b", re.IGNORECASE)
+QUESTION_SUBJECT_RE = re.compile(r"\b([A-Z]{2,6}\d{3,4})\b")
+QUESTION_THRESHOLD_RE = re.compile(
+    r"\b(above|over|more than|greater than|at least|no less than|"
+    r"below|under|less than|at most|no more than)\s+(\d+(?:\.\d+)?)",
+    re.IGNORECASE
+)
+
+# phrase → (direction, inclusive): "at least 7.95" must count 7.95 itself
+THRESHOLD_PHRASES = {
+    "above": ("above", False),
+    "over": ("above", False),
+    "more than": ("above", False),
+    "greater than": ("above", False),
+    "at least": ("above", True),
+    "no less than": ("above", True),
+    "below": ("below", False),
+    "under": ("below", False),
+    "less than": ("below", False),
+    "at most": ("below", True),
+    "no more than": ("below", True),
+}
+
+THRESHOLD_LABELS = {
+    ("above", False): "above",
+    ("above", True): "at least",
+    ("below", False): "below",
+    ("below", True): "at most",
+}
+
+PASS_PERCENTAGE_RE = re.compile(r"\bpass(?:ing)?\s*(?:percentage|percent|rate|%)", re.IGNORECASE)
+FAIL_RE = re.compile(r"\bfail(?:ed|ing|ures?)?\b", re.IGNORECASE)
+COUNT_OR_LIST_RE = re.compile(r"\b(how many|count|number of|who|which|list|students)\b", re.IGNORECASE)
+HIGHEST_RE = re.compile(r"\b(highest|top|toppers?|maximum|max|best)\b", re.IGNORECASE)
+LOWEST_RE = re.compile(r"\b(lowest|minimum|min|least|worst)\b", re.IGNORECASE)
+AVERAGE_RE = re.compile(r"\b(average|avg|mean)\b", re.IGNORECASE)
+RESULT_WORDS_RE = re.compile(r"\b(marks?|sgpi|gpa|pointers?|toppers?|scored?|students?|results?)\b", re.IGNORECASE)
+
+
+def detect_analytics_intent(question):
+    """
+    Returns (intent, params) for aggregate result questions, else None.
+    Intents: pass_percentage, fail_count, threshold, highest, lowest, average.
+    """
+
+    params = {"semester": None, "subject_code": None}
+
+    sem_match = QUESTION_SEMESTER_RE.search(question)
+    if sem_match:
+        params["semester"] = parse_semester(sem_match.group(1))
+
+    code_match = QUESTION_SUBJECT_RE.search(question.upper())
+    if code_match:
+        params["subject_code"] = code_match.group(1)
+
+    lowered = question.lower()
+    params["metric"] = (
+        "subject" if params["subject_code"]
+        else "sgpi" if "sgpi" in lowered or "gpa" in lowered or "pointer" in lowered
+        else "total" if "total" in lowered
+        else "sgpi"
+    )
+
+    if PASS_PERCENTAGE_RE.search(question):
+        return "pass_percentage", params
+
+    # "top events", "over 2 days" ... are not about results
+    if not params["subject_code"] and not RESULT_WORDS_RE.search(question):
+        return None
+
+    # "Did <name> fail?" is a lookup, not an aggregate
+    if FAIL_RE.search(question) and COUNT_OR_LIST_RE.search(question) and not params["subject_code"]:
+        return "fail_count", params
+
+    threshold_match = QUESTION_THRESHOLD_RE.search(question)
+    if threshold_match:
+        phrase = " ".join(threshold_match.group(1).lower().split())
+        params["direction"], params["inclusive"] = THRESHOLD_PHRASES[phrase]
+        params["threshold"] = float(threshold_match.group(2))
+        return "threshold", params
+
+    if HIGHEST_RE.search(question):
+        return "highest", params
+
+    if LOWEST_RE.search(question):
+        return "lowest", params
+
+    if AVERAGE_RE.search(question):
+        return "average", params
+
+    return None
+
+
+# =====================================================
+# AGGREGATE QUERIES (SQL, NOT RAW CHUNKS)
+# =====================================================
+
+def _per_student(db, semester):
+    """
+    One row per distinct student (name + semester), so the same ledger
+    uploaded twice does not double-count anybody.
+    """
+
+    query = db.query(
+        StudentResult.name_normalized.label("key"),
+        StudentResult.semester.label("semester"),
+        func.min(StudentResult.name).label("name"),
+        func.max(StudentResult.sgpi).label("sgpi"),
+        func.max(StudentResult.total_marks).label("total_marks"),
+        func.max(case((StudentResult.result == "Fail", 1), else_=0)).label("failed"),
+    )
+
+    if semester is not None:
+        query = query.filter(StudentResult.semester == semester)
+
+    return query.group_by(StudentResult.name_normalized, StudentResult.semester)
+
+
+def _per_student_marks(db, subject_code, semester):
+
+    query = db.query(
+        StudentResult.name_normalized.label("key"),
+        SubjectMark.semester.label("semester"),
+        func.min(StudentResult.name).label("name"),
+        func.max(SubjectMark.marks).label("marks"),
+    ).join(
+        StudentResult, StudentResult.id == SubjectMark.student_result_id
+    ).filter(
+        SubjectMark.subject_code == subject_code
+    )
+
+    if semester is not None:
+        query = query.filter(SubjectMark.semester == semester)
+
+    return query.group_by(StudentResult.name_normalized, SubjectMark.semester)
+
+
+def _metric_column(subquery, metric):
+    if metric == "subject":
+        return subquery.c.marks
+    if metric == "total":
+        return subquery.c.total_marks
+    return subquery.c.sgpi
+
+
+def _metric_label(params):
+    if params["metric"] == "subject":
+        return f"marks in {params['subject_code']}"
+    if params["metric"] == "total":
+        return "total marks"
+    return "SGPI"
+
+
+def _scope_label(params):
+    return f" (semester {params['semester']})" if params["semester"] is not None else ""
+
+
+def _student_rows(db, params):
+    if params["metric"] == "subject":
+        return _per_student_marks(db, params["subject_code"], params["semester"]).subquery()
+    return _per_student(db, params["semester"]).subquery()
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return f"{value:g}"
+    return str(value)
+
+
+def _format_students(rows):
+    return "\n".join(f"- {row.name} — {_format_value(row.value)}" for row in rows)
+
+
+def _pass_percentage(db, params):
+
+    students = _per_student(db, params["semester"]).subquery()
+
+    total, failed = db.query(
+        func.count(), func.coalesce(func.sum(students.c.failed), 0)
+    ).select_from(students).one()
+
+    if not total:
+        return None
+
+    passed = total - failed
+
+    return (
+        f"Pass percentage{_scope_label(params)}:\n"
+        f"- Students: {total}\n"
+        f"- Passed: {passed}\n"
+        f"- Failed: {failed}\n"
+        f"- Pass percentage: {passed * 100.0 / total:.2f}%"
+    )
+
+
+def _fail_count(db, params):
+
+    students = _per_student(db, params["semester"]).subquery()
+
+    total = db.query(func.count()).select_from(students).scalar()
+
+    if not total:
+        return None
+
+    failed_rows = db.query(students.c.name).filter(
+        students.c.failed == 1
+    ).order_by(students.c.name).all()
+
+    lines = [
+        f"Failed students{_scope_label(params)}:",
+        f"- Failed: {len(failed_rows)} of {total} students",
+    ]
+    lines.extend(f"- {row.name}" for row in failed_rows[:ANALYTICS_TOP_N])
+
+    if len(failed_rows) > ANALYTICS_TOP_N:
+        lines.append(f"- ... and {len(failed_rows) - ANALYTICS_TOP_N} more")
+
+    return "\n".join(lines)
+
+
+def _ranked(db, params, descending):
+
+    students = _student_rows(db, params)
+    value = _metric_column(students, params["metric"])
+
+    rows = db.query(
+        students.c.name, value.label("value")
+    ).filter(
+        value.isnot(None)
+    ).order_by(
+        value.desc() if descending else value.asc(), students.c.name
+    ).limit(ANALYTICS_TOP_N).all()
+
+    if not rows:
+        return None
+
+    heading = "Highest" if descending else "Lowest"
+
+    return f"{heading} {_metric_label(params)}{_scope_label(params)}:\n{_format_students(rows)}"
+
+
+def _threshold(db, params):
+
+    students = _student_rows(db, params)
+    value = _metric_column(students, params["metric"])
+
+    threshold = params["threshold"]
+    inclusive = params.get("inclusive", False)
+
+    if params["direction"] == "above":
+        condition = value >= threshold if inclusive else value > threshold
+    else:
+        condition = value <= threshold if inclusive else value < threshold
+
+    comparison = THRESHOLD_LABELS[(params["direction"], inclusive)]
+
+    # No results in scope is "no data" (fall back to retrieval), not "0 students"
+    if not db.query(func.count(value)).select_from(students).scalar():
+        return None
+
+    count = db.query(func.count()).select_from(students).filter(condition).scalar()
+
+    if not count:
+        return (
+            f"Students with {_metric_label(params)} {comparison} "
+            f"{_format_value(params['threshold'])}{_scope_label(params)}: 0"
+        )
+
+    rows = db.query(
+        students.c.name, value.label("value")
+    ).filter(condition).order_by(value.desc()).limit(ANALYTICS_TOP_N).all()
+
+    text = (
+        f"Students with {_metric_label(params)} {comparison} "
+        f"{_format_value(params['threshold'])}{_scope_label(params)}: {count}\n"
+        f"{_format_students(rows)}"
+    )
+
+    if count > len(rows):
+        text += f"\n- ... and {count - len(rows)} more"
+
+    return text
+
+
+def _average(db, params):
+
+    students = _student_rows(db, params)
+    value = _metric_column(students, params["metric"])
+
+    average, count = db.query(
+        func.avg(value), func.count(value)
+    ).select_from(students).one()
+
+    if not count:
+        return None
+
+    return (
+        f"Average {_metric_label(params)}{_scope_label(params)}: "
+        f"{average:.2f} (over {count} students)"
+    )
+
+
+ANALYTICS_HANDLERS = {
+    "pass_percentage": _pass_percentage,
+    "fail_count": _fail_count,
+    "threshold": _threshold,
+    "highest": lambda db, params: _ranked(db, params, descending=True),
+    "lowest": lambda db, params: _ranked(db, params, descending=False),
+    "average": _average,
+}
+
+
+def _source_filenames(db, params):
+
+    query = db.query(Document.filename).join(
+        StudentResult, StudentResult.document_id == Document.id
+    )
+
+    if params["semester"] is not None:
+        query = query.filter(StudentResult.semester == params["semester"])
+
+    return [filename for (filename,) in query.distinct().all()]
+
+
+def answer_result_analytics(db, question):
+    """
+    Answer aggregate result questions ("highest marks in CSC501",
+    "how many failed in sem 5", "pass percentage", "toppers") with SQL
+    over the structured results tables.
+    Returns {"intent", "context", "sources"} or None when the question is
+    not analytical or no structured data matches.
+    """
+
+    detected = detect_analytics_intent(question)
+
+    if detected is None:
+        return None
+
+    intent, params = detected
+
+    context = ANALYTICS_HANDLERS[intent](db, params)
+
+    if not context:
+        return None
+
+    return {
+        "intent": intent,
+        "context": "Computed from the structured student results table:\n" + context,
+        "sources": _source_filenames(db, params),
+    }
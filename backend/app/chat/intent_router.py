@@ -0,0 +1,233 @@
+import re
+import threading
+
+from sqlalchemy import or_
+
+from app.models.document import Document
+from app.models.student_result import StudentResult, SubjectMark
+from app.document.results_store import normalize_name, parse_semester
+
+
+# =====================================================
+# DIRECT LOOKUP PATTERNS
+# =====================================================
+
+# "result of <name> sem 5", "what is the sgpi of <name> in semester V"
+RESULT_LOOKUP_RE = re.compile(
+    r"^(?:(?:what|show|give|tell)\b.*?\b)?"
+    r"(?:result|results|sgpi|gpa|pointer|total marks|performance)\s+(?:of|for)\s+"
+    r"(?P<name>[a-z][a-z0-9 .']*?)"
+    r"(?:\s*,?\s*(?:in\s+|for\s+)?sem(?:ester)?\s*[- ]?\s*(?P<semester>\d{1,2}|[ivx]{1,4}))?"
+    r"\s*[?.!]*$",
+    re.IGNORECASE
+)
+
+# "marks of <name> in CSC501", "marks of <name> in csc501 sem 5"
+SUBJECT_LOOKUP_RE = re.compile(
+    r"^(?:(?:what|show|give|tell)\b.*?\b)?"
+    r"marks?\s+(?:of|for)\s+"
+    r"(?P<name>[a-z][a-z0-9 .']*?)\s+in\s+(?P<code>[a-z]{2,6}\d{3,4})"
+    r"(?:\s*,?\s*(?:in\s+|for\s+)?sem(?:ester)?\s*[- ]?\s*(?P<semester>\d{1,2}|[ivx]{1,4}))?"
+    r"\s*[?.!]*$",
+    re.IGNORECASE
+)
+
+MIN_NAME_LENGTH = 3
+
+
+# =====================================================
+# ANSWER PATH COUNTERS
+# =====================================================
+
+class AnswerPathStats:
+    """Counts and time spent per answer path (fast_path / analytics / llm)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._paths = {}
+
+    def record(self, path, seconds):
+        with self._lock:
+            entry = self._paths.setdefault(path, {"count": 0, "seconds": 0.0})
+            entry["count"] += 1
+            entry["seconds"] += seconds
+
+    def get_stats(self):
+        with self._lock:
+            total = sum(entry["count"] for entry in self._paths.values())
+
+            return {
+                "total": total,
+                "paths": {
+                    path: {
+                        "count": entry["count"],
+                        "share": round(entry["count"] / total, 4) if total else None,
+                        "avg_ms": round(entry["seconds"] * 1000 / entry["count"], 2),
+                    }
+                    for path, entry in self._paths.items()
+                },
+            }
+
+
+answer_path_stats = AnswerPathStats()
+
+
+# =====================================================
+# FAST PATH
+# =====================================================
+
+def _known(value):
+    return value is not None and value != "Unknown"
+
+
+def _format_number(value):
+    if isinstance(value, float):
+        return f"{value:g}"
+    return str(value)
+
+
+def _match_students(db, name, semester):
+    """
+    Exact normalised-name match first, then a match starting at a word of
+    the name (whole word or prefix: "rahul" / "rahul des" → "rahul desai",
+    but never "ali" → "khalid"). Returns the rows of exactly one (name,
+    semester) student, or None when ambiguous/missing.
+    """
+
+    key = normalize_name(name)
+
+    if len(key) < MIN_NAME_LENGTH:
+        return None
+
+    for condition in (
+        StudentResult.name_normalized == key,
+        or_(
+            StudentResult.name_normalized.like(f"{key}%"),
+            StudentResult.name_normalized.like(f"% {key}%"),
+        ),
+    ):
+        query = db.query(StudentResult).filter(condition)
+
+        if semester is not None:
+            query = query.filter(StudentResult.semester == semester)
+
+        rows = query.order_by(StudentResult.id.desc()).all()
+
+        if not rows:
+            continue
+
+        students = {(row.name_normalized, row.semester) for row in rows}
+
+        if len(students) != 1:
+            return None
+
+        return rows
+
+    return None
+
+
+def _consistent(rows, fields):
+    """The same ledger uploaded twice is fine; conflicting values are not."""
+    return all(
+        len({getattr(row, field) for row in rows}) == 1
+        for field in fields
+    )
+
+
+def _source_filenames(db, rows):
+
+    document_ids = {row.document_id for row in rows}
+
+    return [
+        filename for (filename,) in db.query(Document.filename).filter(
+            Document.id.in_(document_ids)
+        ).all()
+    ]
+
+
+def _answer_result_lookup(db, name, semester):
+
+    rows = _match_students(db, name, semester)
+
+    if not rows or not _consistent(rows, ("sgpi", "total_marks", "result")):
+        return None
+
+    row = rows[0]
+
+    lines = [f"Name: {row.name}"]
+
+    if _known(row.semester_label):
+        lines.append(f"Semester: {row.semester_label}")
+    if _known(row.sgpi):
+        lines.append(f"SGPI: {_format_number(row.sgpi)}")
+    if _known(row.total_marks):
+        lines.append(f"Total Marks: {row.total_marks}")
+    if _known(row.result):
+        lines.append(f"Result: {row.result}")
+
+    return {
+        "answer": "\n".join(lines),
+        "sources": _source_filenames(db, rows),
+    }
+
+
+def _answer_subject_lookup(db, name, code, semester):
+
+    rows = _match_students(db, name, semester)
+
+    if not rows:
+        return None
+
+    marks = db.query(SubjectMark.marks).filter(
+        SubjectMark.student_result_id.in_([row.id for row in rows]),
+        SubjectMark.subject_code == code.upper()
+    ).distinct().all()
+
+    if len(marks) != 1 or marks[0][0] is None:
+        return None
+
+    row = rows[0]
+
+    lines = [
+        f"Name: {row.name}",
+        f"Subject: {code.upper()}",
+        f"Marks: {marks[0][0]}",
+    ]
+
+    if _known(row.semester_label):
+        lines.append(f"Semester: {row.semester_label}")
+
+    return {
+        "answer": "\n".join(lines),
+        "sources": _source_filenames(db, rows),
+    }
+
+
+def answer_direct_lookup(db, question):
+    """
+    Serve "result of <name> sem N" and "marks of <name> in <code>" straight
+    from the structured results tables, in the same field format the LLM
+    is instructed to use. Returns {"answer", "sources"} or None when the
+    question is not a lookup or the match is not unambiguous.
+    """
+
+    question = " ".join(question.split())
+
+    match = SUBJECT_LOOKUP_RE.match(question)
+    if match:
+        return _answer_subject_lookup(
+            db,
+            match.group("name"),
+            match.group("code"),
+            parse_semester(match.group("semester")),
+        )
+
+    match = RESULT_LOOKUP_RE.match(question)
+    if match:
+        return _answer_result_lookup(
+            db,
+            match.group("name"),
+            parse_semester(match.group("semester")),
+        )
+
+    return None
@@ -1,3 +1,4 @@
+import time
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 from sqlalchemy.orm import Session, joinedload
@@ -8,7 +9,14 @@ from app.llm.gemini_service import generate_answer
 from app.database import SessionLocal
 from app.models.chunk import DocumentChunk
 from app.models.document import Document
-from app.document.faiss_manager import get_index
+from app.document.faiss_manager import (
+    get_index,
+    describe_current_index,
+    get_generation_stats,
+    get_vector_counts,
+)
+from app.chat.analytics import answer_result_analytics
+from app.chat.intent_router import answer_direct_lookup, answer_path_stats
 
 
 router = APIRouter()
@@ -37,14 +45,48 @@ def ask_question(data: QuestionRequest, user=Depends(get_current_user)):
             "answer": "Question cannot be empty."
         }
 
+    start_time = time.perf_counter()
+
+    def served(path, response):
+        answer_path_stats.record(path, time.perf_counter() - start_time)
+        response["served_by"] = path
+        return response
+
+    db: Session = SessionLocal()
+
+    try:
+        # ⚡ Direct student lookups → answered from structured results, no LLM
+        lookup = answer_direct_lookup(db, question)
+
+        # 0️⃣ Aggregate result questions → SQL over structured results
+        analytics = None if lookup else answer_result_analytics(db, question)
+    finally:
+        db.close()
+
+    if lookup:
+        return served("fast_path", {
+            "question": question,
+            "answer": lookup["answer"],
+            "sources": lookup["sources"]
+        })
+
+    if analytics:
+        answer = generate_answer(question, analytics["context"])
+
+        return served("analytics", {
+            "question": question,
+            "answer": answer,
+            "sources": analytics["sources"]
+        })
+
     # 1️⃣ Retrieve vector IDs from FAISS
     vector_ids = search_similar_chunks(question, top_k=8)
 
     if not vector_ids:
-        return {
+        return served("no_match", {
             "question": question,
             "answer": "No relevant information found in uploaded documents."
-        }
+        })
 
     db: Session = SessionLocal()
 
@@ -81,19 +123,19 @@ def ask_question(data: QuestionRequest, user=Depends(get_current_user)):
         db.close()
 
     if not context.strip():
-        return {
+        return served("no_match", {
             "question": question,
             "answer": "No relevant information found in uploaded documents."
-        }
+        })
 
     # 2️⃣ Generate Answer from LLM
     answer = generate_answer(question, context)
 
-    return {
+    return served("llm", {
         "question": question,
         "answer": answer,
         "sources": source_documents
-    }
+    })
 
 
 # =====================================================
@@ -129,7 +171,10 @@ def debug_faiss():
 
         return {
             "total_vectors": index.ntotal,
-            "dimension": index.d
+            "dimension": index.d,
+            "index": describe_current_index(),
+            "generation": get_generation_stats(),
+            "vectors": get_vector_counts()
         }
 
     except Exception as e:
@@ -0,0 +1,729 @@
+import os
+import sys
+import time
+import weakref
+import argparse
+
+import faiss
+import numpy as np
+
+
+# =====================================================
+# CONFIG
+# =====================================================
+
+# flat → exact brute force; ivf → inverted lists (needs training); hnsw → graph
+FAISS_INDEX_TYPE = os.getenv("FAISS_INDEX_TYPE", "flat").lower()
+
+FAISS_IVF_NLIST = int(os.getenv("FAISS_IVF_NLIST", "0"))  # 0 → sized from data
+FAISS_NPROBE = int(os.getenv("FAISS_NPROBE", "16"))
+
+FAISS_HNSW_M = int(os.getenv("FAISS_HNSW_M", "32"))
+FAISS_HNSW_EF_CONSTRUCTION = int(os.getenv("FAISS_HNSW_EF_CONSTRUCTION", "80"))
+FAISS_EF_SEARCH = int(os.getenv("FAISS_EF_SEARCH", "64"))
+
+# Filtered search on a graph index: up to this many allowed IDs are scored
+# directly (a selective filter cuts the HNSW walk short and loses hits)
+FAISS_FILTER_EXACT_MAX = int(os.getenv("FAISS_FILTER_EXACT_MAX", "20000"))
+
+# How each vector is stored: float32 → raw (1536 bytes at d=384);
+# float16 / sq8 → scalar quantized (2× / 4× smaller); pq → product
+# quantized to FAISS_PQ_M bytes
+FAISS_INDEX_ENCODING = os.getenv("FAISS_INDEX_ENCODING", "float32").lower()
+FAISS_PQ_M = int(os.getenv("FAISS_PQ_M", "48"))  # must divide the dimension
+
+INDEX_TYPES = ("flat", "ivf", "hnsw")
+ENCODINGS = ("float32", "float16", "sq8", "pq")
+
+# FAISS warns below ~39 training points per centroid
+IVF_MIN_POINTS_PER_LIST = 39
+IVF_MAX_TRAINING_POINTS = 256 * 1024
+
+# PQ trains 256 centroids per sub-quantizer
+PQ_MIN_TRAINING_POINTS = 256 * IVF_MIN_POINTS_PER_LIST
+
+ADD_BATCH_SIZE = 65536
+
+# index → (ntotal, sorted IDs, storage positions) for _search_subset
+_id_positions = weakref.WeakKeyDictionary()
+
+# faiss pads missing results with id -1 and this distance
+MISSING_DISTANCE = np.finfo("float32").max
+
+
+def default_nlist(ntotal):
+
+    if FAISS_IVF_NLIST > 0:
+        return FAISS_IVF_NLIST
+
+    nlist = int(4 * np.sqrt(max(ntotal, 1)))
+
+    return max(1, min(nlist, ntotal // IVF_MIN_POINTS_PER_LIST))
+
+
+# =====================================================
+# BUILD
+# =====================================================
+
+def encoding_code(encoding, pq_m=None):
+
+    codes = {
+        "float32": "Flat",
+        "float16": "SQfp16",
+        "sq8": "SQ8",
+        "pq": f"PQ{pq_m or FAISS_PQ_M}",
+    }
+
+    if encoding not in codes:
+        raise ValueError(f"Unknown encoding '{encoding}' (expected one of {ENCODINGS})")
+
+    return codes[encoding]
+
+
+def factory_string(index_type, ntotal=0, nlist=None, hnsw_m=None, encoding=None, pq_m=None):
+
+    code = encoding_code(encoding or FAISS_INDEX_ENCODING, pq_m)
+
+    if index_type == "flat":
+        # IndexPQ rejects search params (no IDSelector filtering); one
+        # inverted list scans the same codes and accepts them
+        return f"IVF1,{code}" if code.startswith("PQ") else f"IDMap,{code}"
+
+    if index_type == "ivf":
+        return f"IVF{nlist or default_nlist(ntotal)},{code}"
+
+    if index_type == "hnsw":
+        return f"IDMap,HNSW{hnsw_m or FAISS_HNSW_M},{code}"
+
+    raise ValueError(f"Unknown index type '{index_type}' (expected one of {INDEX_TYPES})")
+
+
+def create_empty_index(dimension, index_type=None, encoding=None):
+    """
+    A new, empty index ready for add_with_ids(). Types and encodings that
+    need training (IVF, sq8, pq) cannot start empty: they begin as flat /
+    float16 until `build` or `migrate` runs.
+    """
+
+    index_type = index_type or FAISS_INDEX_TYPE
+    encoding = encoding or FAISS_INDEX_ENCODING
+
+    if index_type == "ivf":
+        print("[FAISS] IVF needs training data — starting with a flat index, "
+              "run `python -m app.document.ann_index build --type ivf` once vectors exist")
+        index_type = "flat"
+
+    if encoding in ("sq8", "pq"):
+        print(f"[FAISS] {encoding} needs training data — starting with float16, "
+              f"run `python -m app.document.ann_index migrate --encoding {encoding}` once vectors exist")
+        encoding = "float16"
+
+    index = faiss.index_factory(dimension, factory_string(index_type, encoding=encoding))
+    apply_search_params(index)
+
+    return index
+
+
+def build_index(vectors, ids, index_type=None, nlist=None, hnsw_m=None, encoding=None, pq_m=None):
+    """
+    Build (and train, if needed) an index of `index_type` with vectors
+    stored as `encoding` over float32 `vectors` with int64 `ids`.
+    """
+
+    index_type = index_type or FAISS_INDEX_TYPE
+    encoding = encoding or FAISS_INDEX_ENCODING
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    ids = np.ascontiguousarray(ids, dtype="int64")
+
+    if index_type == "ivf" and len(vectors) < IVF_MIN_POINTS_PER_LIST:
+        print(f"[FAISS] Only {len(vectors)} vectors — too few to train IVF, building flat")
+        index_type = "flat"
+
+    if encoding == "pq" and len(vectors) < PQ_MIN_TRAINING_POINTS:
+        print(f"[FAISS] Only {len(vectors)} vectors — too few to train PQ, using sq8")
+        encoding = "sq8"
+
+    index = faiss.index_factory(
+        vectors.shape[1],
+        factory_string(index_type, len(vectors), nlist, hnsw_m, encoding, pq_m)
+    )
+
+    hnsw = _hnsw(index)
+    if hnsw is not None:
+        hnsw.efConstruction = FAISS_HNSW_EF_CONSTRUCTION
+
+    if not index.is_trained:
+        rng = np.random.default_rng(0)
+        sample = vectors
+        if len(vectors) > IVF_MAX_TRAINING_POINTS:
+            sample = vectors[rng.choice(len(vectors), IVF_MAX_TRAINING_POINTS, replace=False)]
+        index.train(sample)
+
+    for start in range(0, len(vectors), ADD_BATCH_SIZE):
+        index.add_with_ids(
+            vectors[start:start + ADD_BATCH_SIZE],
+            ids[start:start + ADD_BATCH_SIZE]
+        )
+
+    apply_search_params(index)
+
+    return index
+
+
+# =====================================================
+# QUERY-TIME KNOBS
+# =====================================================
+
+def _hnsw(index):
+
+    inner = faiss.downcast_index(index)
+    if isinstance(inner, faiss.IndexIDMap):
+        inner = faiss.downcast_index(inner.index)
+
+    return inner.hnsw if hasattr(inner, "hnsw") else None
+
+
+def apply_search_params(index, nprobe=None, ef_search=None):
+
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = min(nprobe or FAISS_NPROBE, ivf.nlist)
+
+    hnsw = _hnsw(index)
+    if hnsw is not None:
+        hnsw.efSearch = ef_search or FAISS_EF_SEARCH
+
+
+def search_parameters(index, selector=None, exhaustive=False):
+    """
+    SearchParameters of the right subclass for `index`. Passing params
+    replaces the index's own nprobe / efSearch, so they are copied over.
+    exhaustive=True probes every IVF list: with a selector of allowed IDs
+    only those are scored, so results are exact within the allowed set.
+    """
+
+    ivf = faiss.try_extract_index_ivf(index)
+    hnsw = _hnsw(index)
+
+    if ivf is not None:
+        params = faiss.SearchParametersIVF()
+        params.nprobe = ivf.nlist if exhaustive else ivf.nprobe
+    elif hnsw is not None:
+        params = faiss.SearchParametersHNSW()
+        params.efSearch = hnsw.efSearch
+    else:
+        params = faiss.SearchParameters()
+
+    if selector is not None:
+        params.sel = selector
+        params.referenced_objects = [selector]  # keep the C++ object alive
+
+    return params
+
+
+def id_selector(ids, exclude=False):
+    """IDSelector accepting only `ids` (or everything but them, with exclude=True)."""
+
+    batch = faiss.IDSelectorBatch(np.fromiter(ids, dtype="int64", count=len(ids)))
+
+    if not exclude:
+        return batch
+
+    selector = faiss.IDSelectorNot(batch)
+    selector.referenced_objects = [batch]
+
+    return selector
+
+
+def search_allowed(index, queries, k, allowed_ids):
+    """
+    The k nearest vectors among `allowed_ids` (filter pushdown). Exact for
+    flat and IVF (every list probed, only allowed IDs scored) and for
+    HNSW with up to FAISS_FILTER_EXACT_MAX allowed IDs; larger filters
+    walk the graph with the selector.
+    """
+
+    if _hnsw(index) is not None and len(allowed_ids) <= FAISS_FILTER_EXACT_MAX:
+        return _search_subset(index, queries, k, allowed_ids)
+
+    return index.search(
+        queries, k,
+        params=search_parameters(index, id_selector(allowed_ids), exhaustive=True)
+    )
+
+
+def _search_subset(index, queries, k, allowed_ids):
+    """Brute force over the allowed vectors of an IDMap-wrapped index."""
+
+    id_map = faiss.downcast_index(index)
+
+    # Sorted id_map → storage positions, kept until the index grows
+    cache = _id_positions.get(index)
+    if cache is None or cache[0] != index.ntotal:
+        ids = faiss.vector_to_array(id_map.id_map)
+        order = np.argsort(ids, kind="stable")
+        cache = (index.ntotal, ids[order], order)
+        _id_positions[index] = cache
+
+    _, sorted_ids, order = cache
+
+    wanted = np.fromiter(allowed_ids, dtype="int64", count=len(allowed_ids))
+    slots = np.minimum(np.searchsorted(sorted_ids, wanted), max(len(sorted_ids) - 1, 0))
+    found = sorted_ids[slots] == wanted if len(sorted_ids) else np.zeros(len(wanted), dtype=bool)
+
+    if not found.any():
+        return merge_results([(np.empty((len(queries), 0), "float32"), np.empty((len(queries), 0), "int64"))], k)
+
+    found_ids = wanted[found]
+    vectors = faiss.downcast_index(id_map.index).reconstruct_batch(order[slots[found]])
+
+    distances, local = faiss.knn(queries, vectors, min(k, len(found_ids)))
+    ids = np.where(local >= 0, found_ids[local], -1)
+
+    return merge_results([(distances, ids)], k)
+
+
+def merge_results(results, k):
+    """
+    Merge (distances, ids) pairs from several indexes into the k nearest
+    per query, padded like faiss pads (id -1, MISSING_DISTANCE).
+    """
+
+    distances = np.hstack([d for d, _ in results])
+    ids = np.hstack([i for _, i in results])
+
+    order = np.argsort(distances, axis=1, kind="stable")[:, :k]
+    distances = np.take_along_axis(distances, order, axis=1)
+    ids = np.take_along_axis(ids, order, axis=1)
+
+    if ids.shape[1] < k:
+        pad = k - ids.shape[1]
+        distances = np.pad(distances, ((0, 0), (0, pad)), constant_values=MISSING_DISTANCE)
+        ids = np.pad(ids, ((0, 0), (0, pad)), constant_values=-1)
+
+    return distances, ids
+
+
+def _codes_index(index):
+    """The part of `index` that stores the vector codes."""
+
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        return faiss.downcast_index(ivf)
+
+    inner = faiss.downcast_index(index)
+    if isinstance(inner, faiss.IndexIDMap):
+        inner = faiss.downcast_index(inner.index)
+    if hasattr(inner, "hnsw"):
+        inner = faiss.downcast_index(inner.storage)
+
+    return inner
+
+
+def index_encoding(index):
+
+    codes = _codes_index(index)
+
+    if hasattr(codes, "pq"):
+        return "pq"
+
+    if hasattr(codes, "sq"):
+        return {
+            faiss.ScalarQuantizer.QT_fp16: "float16",
+            faiss.ScalarQuantizer.QT_8bit: "sq8",
+        }.get(codes.sq.qtype, "sq")
+
+    return "float32"
+
+
+def describe_index(index):
+
+    ivf = faiss.try_extract_index_ivf(index)
+    hnsw = _hnsw(index)
+
+    # A single inverted list scans everything, like flat (see factory_string)
+    if ivf is not None and ivf.nlist == 1:
+        ivf = None
+
+    info = {
+        "type": "ivf" if ivf is not None else "hnsw" if hnsw is not None else "flat",
+        "encoding": index_encoding(index),
+        "ntotal": index.ntotal,
+        "dimension": index.d,
+    }
+
+    if info["encoding"] == "pq":
+        info["pq_m"] = _codes_index(index).pq.M
+
+    if ivf is not None:
+        info["nlist"] = ivf.nlist
+        info["nprobe"] = ivf.nprobe
+    if hnsw is not None:
+        info["ef_search"] = hnsw.efSearch
+
+    return info
+
+
+# =====================================================
+# EXPORT (REBUILD / MIGRATION SOURCE)
+# =====================================================
+
+def stored_ids(index):
+    """All IDs held by `index` (IDMap-wrapped or IVF), as int64."""
+
+    ivf = faiss.try_extract_index_ivf(index)
+
+    if ivf is not None:
+        invlists = ivf.invlists
+        id_lists = [
+            faiss.rev_swig_ptr(invlists.get_ids(list_no), invlists.list_size(list_no)).copy()
+            for list_no in range(ivf.nlist)
+            if invlists.list_size(list_no)
+        ]
+        return np.concatenate(id_lists).astype("int64") if id_lists else np.empty(0, dtype="int64")
+
+    return faiss.vector_to_array(faiss.downcast_index(index).id_map).astype("int64")
+
+
+def export_vectors(index):
+    """
+    Returns (ids int64, vectors float32) for everything stored in `index`.
+    Lossy encodings return their decoded approximation.
+    """
+
+    ivf = faiss.try_extract_index_ivf(index)
+
+    if ivf is not None:
+        ids = stored_ids(index)
+
+        ivf.set_direct_map_type(faiss.DirectMap.Hashtable)
+        vectors = ivf.reconstruct_batch(ids) if len(ids) else np.empty((0, index.d), dtype="float32")
+
+        return ids, vectors
+
+    # Keep `index` referenced: downcast views do not own the C++ object
+    id_map = faiss.downcast_index(index)
+
+    ids = faiss.vector_to_array(id_map.id_map).astype("int64")
+    vectors = faiss.downcast_index(id_map.index).reconstruct_n(0, index.ntotal)
+
+    return ids, vectors
+
+
+def rebuild_without(index, removed_ids):
+    """
+    For indexes that cannot delete in place (HNSW graphs): rebuild the
+    same kind of index from the remaining vectors.
+    """
+
+    ids, vectors = export_vectors(index)
+    keep = ~np.isin(ids, np.asarray(removed_ids, dtype="int64"))
+
+    info = describe_index(index)
+
+    rebuilt = build_index(
+        vectors[keep],
+        ids[keep],
+        index_type=info["type"],
+        nlist=info.get("nlist"),
+        encoding=info["encoding"],
+        pq_m=info.get("pq_m"),
+    )
+
+    return rebuilt, int((~keep).sum())
+
+
+# =====================================================
+# RECALL / LATENCY REPORT
+# =====================================================
+
+def _timed_search(index, queries, k):
+
+    latencies = []
+    results = []
+
+    # One query at a time — that is how the chat route searches
+    for query in queries:
+        start = time.perf_counter()
+        _, found = index.search(query.reshape(1, -1), k)
+        latencies.append(time.perf_counter() - start)
+        results.append(found[0])
+
+    return np.array(results), np.array(latencies) * 1000
+
+
+def _recall(found, truth):
+    hits = sum(len(set(f[f >= 0]) & set(t[t >= 0])) for f, t in zip(found, truth))
+    return hits / max(1, sum(int((t >= 0).sum()) for t in truth))
+
+
+def recall_report(ids, vectors, k=10, num_queries=200, nlist=None):
+    """
+    Hold out `num_queries` stored vectors as queries, index the rest with
+    each type and compare against exact (flat) neighbours.
+    Returns a list of rows {type, params, build_s, recall, p50_ms, p95_ms}.
+    """
+
+    rng = np.random.default_rng(0)
+    order = rng.permutation(len(ids))
+
+    num_queries = min(num_queries, max(1, len(ids) // 10))
+    queries = vectors[order[:num_queries]]
+    base_ids, base_vectors = ids[order[num_queries:]], vectors[order[num_queries:]]
+
+    rows = []
+
+    def measure(index_type, params, index, build_s, truth):
+        found, latencies = _timed_search(index, queries, k)
+        rows.append({
+            "type": index_type,
+            "params": params,
+            "build_s": round(build_s, 2),
+            "recall": round(_recall(found, truth), 4) if truth is not None else 1.0,
+            "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+            "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+        })
+        return found
+
+    start = time.perf_counter()
+    flat = build_index(base_vectors, base_ids, "flat")
+    truth = measure("flat", "exact", flat, time.perf_counter() - start, None)
+
+    start = time.perf_counter()
+    ivf = build_index(base_vectors, base_ids, "ivf", nlist=nlist)
+    ivf_build = time.perf_counter() - start
+
+    ivf_nlist = describe_index(ivf).get("nlist")
+    if ivf_nlist:
+        for nprobe in sorted({1, 4, 16, 64, FAISS_NPROBE}):
+            if nprobe > ivf_nlist:
+                continue
+            apply_search_params(ivf, nprobe=nprobe)
+            measure("ivf", f"nlist={ivf_nlist} nprobe={nprobe}", ivf, ivf_build, truth)
+
+    start = time.perf_counter()
+    hnsw = build_index(base_vectors, base_ids, "hnsw")
+    hnsw_build = time.perf_counter() - start
+
+    for ef_search in sorted({16, 32, 64, 128, FAISS_EF_SEARCH}):
+        apply_search_params(hnsw, ef_search=ef_search)
+        measure("hnsw", f"M={FAISS_HNSW_M} efSearch={ef_search}", hnsw, hnsw_build, truth)
+
+    return rows
+
+
+def print_report(rows, k, num_vectors):
+
+    print(f"\nRecall@{k} vs exact search over {num_vectors} vectors\n")
+    print(f"{'type':<6} {'params':<26} {'build s':>8} {'recall':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    print("-" * 70)
+
+    for row in rows:
+        print(
+            f"{row['type']:<6} {row['params']:<26} {row['build_s']:>8} "
+            f"{row['recall']:>8} {row['p50_ms']:>8} {row['p95_ms']:>8}"
+        )
+
+
+def index_bytes(index):
+    """Size of `index` as written to disk — what each worker keeps in memory."""
+    return len(faiss.serialize_index(index))
+
+
+def encoding_report(ids, vectors, queries, k=10, index_type=None, nlist=None, encodings=ENCODINGS):
+    """
+    Build `index_type` once per encoding over (ids, vectors) and compare
+    memory and recall@k against exact float32 neighbours of `queries`.
+    Returns a list of rows {encoding, type, bytes_per_vector, size_mb,
+    saved_mb, build_s, recall, p50_ms}.
+    """
+
+    index_type = index_type or FAISS_INDEX_TYPE
+    queries = np.ascontiguousarray(queries, dtype="float32")
+
+    _, positions = faiss.knn(queries, vectors, min(k, len(ids)))
+    truth = np.where(positions >= 0, ids[positions], -1)
+
+    rows = []
+
+    for encoding in encodings:
+        if encoding == "pq" and len(ids) < PQ_MIN_TRAINING_POINTS:
+            print(f"[FAISS] Skipping pq: needs at least {PQ_MIN_TRAINING_POINTS} vectors to train")
+            continue
+
+        start = time.perf_counter()
+        index = build_index(vectors, ids, index_type, nlist=nlist, encoding=encoding)
+        build_s = time.perf_counter() - start
+
+        found, latencies = _timed_search(index, queries, k)
+        size = index_bytes(index)
+        info = describe_index(index)
+
+        rows.append({
+            "encoding": info["encoding"] + (f" (M={info['pq_m']})" if "pq_m" in info else ""),
+            "type": info["type"],
+            "bytes_per_vector": round(size / max(1, len(ids)), 1),
+            "size_mb": round(size / 1024 ** 2, 2),
+            "build_s": round(build_s, 2),
+            "recall": round(_recall(found, truth), 4),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        })
+
+    baseline = rows[0]["size_mb"] if rows and encodings[0] == "float32" else None
+
+    for row in rows:
+        row["saved_mb"] = round(baseline - row["size_mb"], 2) if baseline is not None else None
+
+    return rows
+
+
+def print_encoding_report(rows, k, num_vectors, num_queries, source):
+
+    print(f"\nMemory vs recall@{k} over {num_vectors} vectors, {num_queries} queries from {source}\n")
+    print(f"{'encoding':<14} {'type':<6} {'B/vector':>9} {'MB':>8} {'saved MB':>9} "
+          f"{'build s':>8} {'recall':>8} {'p50 ms':>8}")
+    print("-" * 78)
+
+    for row in rows:
+        saved = "-" if row["saved_mb"] is None else row["saved_mb"]
+        print(
+            f"{row['encoding']:<14} {row['type']:<6} {row['bytes_per_vector']:>9} {row['size_mb']:>8} "
+            f"{saved:>9} {row['build_s']:>8} {row['recall']:>8} {row['p50_ms']:>8}"
+        )
+
+    print("\nMB is per worker (every uvicorn worker holds its own copy).")
+
+
+# =====================================================
+# CLI
+# =====================================================
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(
+        prog="python -m app.document.ann_index",
+        description="Build / train the FAISS index and compare index types"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build_cmd = sub.add_parser(
+        "build",
+        help="Rebuild faiss.index as another index type"
+    )
+    build_cmd.add_argument("--type", choices=INDEX_TYPES, default=FAISS_INDEX_TYPE)
+    build_cmd.add_argument("--nlist", type=int, default=None)
+    build_cmd.add_argument("--encoding", choices=ENCODINGS, default=FAISS_INDEX_ENCODING)
+
+    migrate_cmd = sub.add_parser(
+        "migrate",
+        help="Convert faiss.index to another encoding, keeping its type"
+    )
+    migrate_cmd.add_argument("--encoding", choices=ENCODINGS, required=True)
+    migrate_cmd.add_argument("--type", choices=INDEX_TYPES, default=None)
+    migrate_cmd.add_argument("--nlist", type=int, default=None)
+    migrate_cmd.add_argument("--pq-m", type=int, default=None)
+
+    report_cmd = sub.add_parser("report", help="Recall vs latency of each type against flat")
+    report_cmd.add_argument("--k", type=int, default=10)
+    report_cmd.add_argument("--queries", type=int, default=200)
+    report_cmd.add_argument("--nlist", type=int, default=None)
+
+    encodings_cmd = sub.add_parser(
+        "encodings",
+        help="Memory saved vs recall@k of each encoding, on logged queries"
+    )
+    encodings_cmd.add_argument("--k", type=int, default=10)
+    encodings_cmd.add_argument("--queries", type=int, default=1000)
+    encodings_cmd.add_argument("--type", choices=INDEX_TYPES, default=FAISS_INDEX_TYPE)
+    encodings_cmd.add_argument("--nlist", type=int, default=None)
+
+    args = parser.parse_args(argv)
+
+    # Loads the snapshot and replays the vector log
+    from app.document.faiss_manager import (
+        writable_copy, replace_index, describe_current_index, query_log
+    )
+
+    # `since`: changes uploaded while this runs are carried into the new index
+    current, since = writable_copy()
+    ids, vectors = export_vectors(current)
+
+    if args.command == "build":
+        start = time.perf_counter()
+        index = build_index(vectors, ids, args.type, nlist=args.nlist, encoding=args.encoding)
+
+        # New snapshot; the vector log is folded in and cleared
+        replace_index(index, since=since)
+
+        print(
+            f"Built {describe_index(index)} in {time.perf_counter() - start:.1f}s. "
+            "Running workers reload it on their next search."
+        )
+
+    elif args.command == "migrate":
+        # What workers serve, not the private copy (merged flat float32
+        # when partitioned); partitions are built from faiss.index
+        serving = describe_current_index()
+        partitioned = serving["type"] == "partitioned"
+        before = serving["snapshot"] if partitioned else serving
+
+        if before["encoding"] != "float32" and args.encoding != before["encoding"]:
+            print(f"[FAISS] faiss.index is {before['encoding']} — the new index is built from "
+                  "its decoded vectors, re-ingest documents for full precision")
+
+        start = time.perf_counter()
+        index = build_index(
+            vectors, ids,
+            args.type or before["type"],
+            nlist=args.nlist or before.get("nlist"),
+            encoding=args.encoding,
+            pq_m=args.pq_m,
+        )
+        size_before, size_after = index_bytes(current), index_bytes(index)
+
+        replace_index(index, since=since)
+
+        if partitioned:
+            print(
+                f"Migrated faiss.index {before['type']}/{before['encoding']} → {describe_index(index)} "
+                f"in {time.perf_counter() - start:.1f}s ({size_after / 1024 ** 2:.2f} MB on disk). "
+                f"FAISS_PARTITIONS is on: workers keep serving float32 partitions "
+                f"({size_before / 1024 ** 2:.2f} MB per worker)."
+            )
+        else:
+            print(
+                f"Migrated {before['type']}/{before['encoding']} → {describe_index(index)} "
+                f"in {time.perf_counter() - start:.1f}s: {size_before / 1024 ** 2:.2f} MB → "
+                f"{size_after / 1024 ** 2:.2f} MB per worker. "
+                "Running workers reload it on their next search."
+            )
+
+    elif args.command == "report":
+        if len(ids) < 2:
+            print("Not enough vectors for a report")
+            return 1
+
+        print_report(recall_report(ids, vectors, args.k, args.queries, args.nlist), args.k, len(ids))
+
+    elif args.command == "encodings":
+        if len(ids) < 2:
+            print("Not enough vectors for a report")
+            return 1
+
+        queries = query_log.load(args.queries)
+        source = "the query log"
+
+        if len(queries) < 10:
+            # No traffic yet: stored vectors stand in for questions
+            rng = np.random.default_rng(0)
+            queries = vectors[rng.choice(len(ids), min(args.queries, len(ids)), replace=False)]
+            source = "stored vectors (query log has < 10 entries — set FAISS_QUERY_LOG=1 to record questions)"
+
+        rows = encoding_report(ids, vectors, queries, args.k, args.type, args.nlist)
+        print_encoding_report(rows, args.k, len(ids), len(queries), source)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
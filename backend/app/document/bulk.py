@@ -0,0 +1,186 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from app.database import SessionLocal
+from app.models.chunk import DocumentChunk
+from app.models.document import Document
+from app.document.extraction import extract_in_worker
+from app.document.faiss_manager import save_index, remove_vectors
+from app.document.results_store import store_result_records, delete_result_records
+from app.document.processing import (
+    bulk_insert_chunks,
+    record_extraction_stats,
+    chunk_text_with_records,
+    create_embeddings,
+    save_to_faiss,
+)
+
+
+BULK_EXTRACT_WORKERS = int(os.getenv("BULK_EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+BULK_EMBED_BATCH_SIZE = int(os.getenv("BULK_EMBED_BATCH_SIZE", "512"))
+
+SUPPORTED_FILE_TYPES = {"pdf", "docx", "txt", "xml"}
+
+
+# =====================================================
+# BULK INGESTION PIPELINE
+# =====================================================
+
+def ingest_documents_bulk(document_ids, on_stage=None):
+    """
+    Extract many documents on a process pool while the main thread
+    chunks, stores and embeds finished ones in large batches.
+    The FAISS index is written once, at the end.
+    """
+
+    report_stage = on_stage or (lambda stage: None)
+    start_time = time.perf_counter()
+
+    db = SessionLocal()
+
+    try:
+        documents = db.query(Document).filter(
+            Document.id.in_(document_ids)
+        ).all()
+
+        # A retried job may find chunks from an interrupted attempt
+        _clear_existing_chunks(db, [doc.id for doc in documents])
+
+        # Extraction and batch embedding overlap during this stage
+        report_stage("pipeline")
+
+        pending_texts = []
+        pending_ids = []
+        embedding_stats = {"chunks": 0, "cache_hits": 0, "encoded": 0}
+        totals = {"documents": 0, "chunks": 0}
+        failed = []
+
+        def flush_embeddings():
+            if not pending_texts:
+                return
+
+            batch_stats = {}
+            embeddings = create_embeddings(pending_texts, batch_stats)
+            save_to_faiss(embeddings, pending_ids, persist=False)
+
+            for key in embedding_stats:
+                embedding_stats[key] += batch_stats.get(key, 0)
+
+            pending_texts.clear()
+            pending_ids.clear()
+
+        with ProcessPoolExecutor(max_workers=max(1, BULK_EXTRACT_WORKERS)) as pool:
+            futures = {
+                pool.submit(
+                    extract_in_worker,
+                    doc.file_path,
+                    doc.file_type,
+                    doc.file_hash
+                ): doc
+                for doc in documents
+            }
+
+            # Chunk + embed each document as soon as its extraction finishes
+            for future in as_completed(futures):
+                doc = futures[future]
+
+                try:
+                    text, extraction_stats = future.result()
+                except Exception as e:
+                    failed.append({"document_id": doc.id, "error": str(e)})
+                    continue
+
+                record_extraction_stats(db, doc.id, extraction_stats)
+
+                if not text or len(text.strip()) < 50:
+                    failed.append({
+                        "document_id": doc.id,
+                        "error": "Insufficient text extracted"
+                    })
+                    continue
+
+                chunks, result_records = chunk_text_with_records(text)
+
+                chunk_ids = bulk_insert_chunks(db, doc.id, list(enumerate(chunks)))
+                store_result_records(db, doc.id, result_records, chunk_ids)
+
+                pending_ids.extend(chunk_ids)
+                pending_texts.extend(chunks)
+
+                db.commit()
+
+                totals["documents"] += 1
+                totals["chunks"] += len(chunks)
+
+                if len(pending_texts) >= BULK_EMBED_BATCH_SIZE:
+                    flush_embeddings()
+
+        report_stage("embedding")  # final partial batch
+        flush_embeddings()
+
+        report_stage("indexing")
+        save_index()
+
+        elapsed = time.perf_counter() - start_time
+
+        embedding_stats["hit_ratio"] = (
+            round(embedding_stats["cache_hits"] / embedding_stats["chunks"], 4)
+            if embedding_stats["chunks"] else None
+        )
+
+        report = {
+            "status": "success" if totals["documents"] else "error",
+            "documents_processed": totals["documents"],
+            "documents_failed": len(failed),
+            "chunks_processed": totals["chunks"],
+            "seconds": round(elapsed, 3),
+            "documents_per_second": round(totals["documents"] / elapsed, 3) if elapsed else None,
+            "chunks_per_second": round(totals["chunks"] / elapsed, 3) if elapsed else None,
+            "embedding_cache": embedding_stats,
+            "failures": failed,
+        }
+
+        if not totals["documents"]:
+            report["message"] = "No documents could be ingested"
+
+        print(
+            f"📦 Bulk ingestion: {totals['documents']} docs, {totals['chunks']} chunks "
+            f"in {elapsed:.1f}s ({report['documents_per_second']} docs/s, "
+            f"{report['chunks_per_second']} chunks/s)"
+        )
+
+        return report
+
+    except Exception as e:
+        db.rollback()
+        return {
+            "status": "error",
+            "message": str(e)
+        }
+
+    finally:
+        db.close()
+
+
+def _clear_existing_chunks(db, document_ids):
+
+    for document_id in document_ids:
+        delete_result_records(db, document_id)
+
+    existing_ids = [
+        chunk_id for (chunk_id,) in db.query(DocumentChunk.id).filter(
+            DocumentChunk.document_id.in_(document_ids)
+        ).all()
+    ]
+
+    if not existing_ids:
+        db.commit()
+        return
+
+    db.query(DocumentChunk).filter(
+        DocumentChunk.id.in_(existing_ids)
+    ).delete(synchronize_session=False)
+    db.commit()
+
+    remove_vectors(existing_ids)
@@ -0,0 +1,241 @@
+import os
+import time
+import queue
+import threading
+from collections import Counter, deque
+from concurrent.futures import Future
+
+import numpy as np
+
+from app.document.query_cache import query_cache, normalize_question
+from app.utils.metrics import current_rss_mb
+
+
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2")
+
+# Query micro-batching (window of 0 disables batching)
+EMBED_BATCH_WINDOW_MS = float(os.getenv("EMBED_BATCH_WINDOW_MS", "5"))
+EMBED_MAX_BATCH_SIZE = int(os.getenv("EMBED_MAX_BATCH_SIZE", "32"))
+
+
+# =====================================================
+# SHARED EMBEDDING MODEL (ONE PER PROCESS, LAZY)
+# =====================================================
+
+_model = None
+_model_lock = threading.Lock()
+
+_load_stats = {
+    "model_name": EMBEDDING_MODEL_NAME,
+    "loaded": False,
+    "load_seconds": None,
+    "rss_before_mb": None,
+    "rss_after_mb": None,
+    "rss_delta_mb": None,
+}
+
+
+def _load_model():
+
+    rss_before = current_rss_mb()
+    start_time = time.perf_counter()
+
+    # Imported here so that importing this module stays cheap
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+
+    load_seconds = time.perf_counter() - start_time
+    rss_after = current_rss_mb()
+
+    _load_stats.update({
+        "loaded": True,
+        "load_seconds": round(load_seconds, 3),
+        "rss_before_mb": round(rss_before, 1) if rss_before is not None else None,
+        "rss_after_mb": round(rss_after, 1) if rss_after is not None else None,
+        "rss_delta_mb": (
+            round(rss_after - rss_before, 1)
+            if rss_before is not None and rss_after is not None
+            else None
+        ),
+    })
+
+    print(
+        f"[EMBEDDER] Loaded {EMBEDDING_MODEL_NAME} in {load_seconds:.2f}s "
+        f"(RSS delta: {_load_stats['rss_delta_mb']} MB)"
+    )
+
+    return model
+
+
+def get_model():
+
+    global _model
+
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = _load_model()
+
+    return _model
+
+
+def warm_up():
+    get_model()
+    return get_load_stats()
+
+
+def get_load_stats():
+    return dict(_load_stats)
+
+
+# =====================================================
+# QUERY MICRO-BATCHING
+# =====================================================
+
+class QueryBatcher:
+    """
+    Collects questions arriving within a short window (or until the
+    batch is full) and embeds them in a single encode call.
+    """
+
+    def __init__(self, window_ms, max_batch_size):
+        self.window_seconds = window_ms / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._queue_delays_ms = deque(maxlen=2000)
+        self._batches = 0
+        self._queries = 0
+
+    def embed(self, text):
+
+        if self.window_seconds <= 0:
+            return _encode_queries([text])[0]
+
+        self._ensure_started()
+
+        future = Future()
+        self._queue.put((text, time.perf_counter(), future))
+
+        return future.result()
+
+    def _ensure_started(self):
+
+        if self._thread is not None:
+            return
+
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="query-batcher",
+                    daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+
+        while True:
+            batch = [self._queue.get()]
+            deadline = batch[0][1] + self.window_seconds
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            encode_start = time.perf_counter()
+
+            try:
+                vectors = _encode_queries([item[0] for item in batch])
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self._record(batch, encode_start)
+
+            for (_, _, future), vector in zip(batch, vectors):
+                future.set_result(vector)
+
+    def _record(self, batch, encode_start):
+
+        with self._stats_lock:
+            self._batches += 1
+            self._queries += len(batch)
+            self._batch_sizes[len(batch)] += 1
+
+            for _, enqueued_at, _ in batch:
+                self._queue_delays_ms.append(
+                    (encode_start - enqueued_at) * 1000
+                )
+
+    def get_stats(self):
+
+        with self._stats_lock:
+            delays = sorted(self._queue_delays_ms)
+            batch_sizes = dict(sorted(self._batch_sizes.items()))
+            batches = self._batches
+            queries = self._queries
+
+        def percentile(p):
+            if not delays:
+                return None
+            return round(delays[min(len(delays) - 1, int(len(delays) * p))], 3)
+
+        return {
+            "window_ms": self.window_seconds * 1000,
+            "max_batch_size": self.max_batch_size,
+            "batches": batches,
+            "queries": queries,
+            "avg_batch_size": round(queries / batches, 2) if batches else None,
+            "batch_size_histogram": batch_sizes,
+            "queue_delay_ms": {
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": round(delays[-1], 3) if delays else None,
+            },
+        }
+
+
+def _encode_queries(texts):
+
+    vectors = get_model().encode(
+        texts,
+        normalize_embeddings=True,
+        batch_size=max(len(texts), 1),
+        show_progress_bar=False
+    )
+
+    return np.asarray(vectors, dtype="float32")
+
+
+query_batcher = QueryBatcher(EMBED_BATCH_WINDOW_MS, EMBED_MAX_BATCH_SIZE)
+
+
+def embed_query(question: str):
+    """
+    Embed a single question as a (1, dim) float32 array.
+    Repeat questions are served from the LRU cache.
+    """
+
+    key = normalize_question(question)
+
+    vector = query_cache.get(key)
+
+    if vector is None:
+        vector = query_batcher.embed(key)
+        query_cache.put(key, vector)
+
+    return vector.reshape(1, -1)
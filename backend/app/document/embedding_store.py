@@ -0,0 +1,77 @@
+import hashlib
+
+import numpy as np
+from sqlalchemy.exc import IntegrityError
+
+from app.database import SessionLocal
+from app.models.chunk_embedding import ChunkEmbedding
+
+
+# Keep IN (...) lists well under SQLite's bound-parameter limit
+LOOKUP_BATCH_SIZE = 500
+
+
+def chunk_text_hash(text: str):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+# =====================================================
+# PERSISTENT CHUNK EMBEDDINGS (TEXT HASH + MODEL)
+# =====================================================
+
+def load_embeddings(text_hashes, model_name):
+    """
+    Returns {text_hash: float32 vector} for hashes already embedded
+    by model_name.
+    """
+
+    found = {}
+    unique_hashes = list(dict.fromkeys(text_hashes))
+
+    db = SessionLocal()
+
+    try:
+        for start in range(0, len(unique_hashes), LOOKUP_BATCH_SIZE):
+            batch = unique_hashes[start:start + LOOKUP_BATCH_SIZE]
+
+            rows = db.query(
+                ChunkEmbedding.text_hash,
+                ChunkEmbedding.vector
+            ).filter(
+                ChunkEmbedding.model_name == model_name,
+                ChunkEmbedding.text_hash.in_(batch)
+            ).all()
+
+            for text_hash, vector in rows:
+                found[text_hash] = np.frombuffer(vector, dtype="float32")
+
+        return found
+
+    finally:
+        db.close()
+
+
+def store_embeddings(vectors_by_hash, model_name):
+
+    if not vectors_by_hash:
+        return
+
+    db = SessionLocal()
+
+    try:
+        db.bulk_insert_mappings(ChunkEmbedding, [
+            {
+                "text_hash": text_hash,
+                "model_name": model_name,
+                "vector": np.asarray(vector, dtype="float32").tobytes(),
+            }
+            for text_hash, vector in vectors_by_hash.items()
+        ])
+        db.commit()
+
+    except IntegrityError:
+        # Another worker stored some of these first; the cache is best-effort
+        db.rollback()
+
+    finally:
+        db.close()
@@ -0,0 +1,289 @@
+import os
+import time
+import tempfile
+import subprocess
+import pdfplumber
+from docx import Document as DocxDocument
+import xml.etree.ElementTree as ET
+
+from app.document.ocr import ocr_pdf_pages, ocr_images, OCR_VERSION
+from app.document.extraction_cache import extraction_cache
+from app.utils.files import file_sha256
+
+
+# =====================================================
+# CONFIGURE EXTERNAL TOOLS (UPDATE PATHS IF NEEDED)
+# =====================================================
+
+# Poppler / Tesseract paths live in app.document.ocr
+GHOSTSCRIPT_CMD = "gswin64c"  # make sure this works in CMD
+
+
+# =====================================================
+# EXTRACT TEXT (PDF + OCR + Ghostscript)
+# =====================================================
+
+# A pdfplumber page with less text than this is OCR'd instead
+MIN_PAGE_TEXT_CHARS = 50
+
+# Bump whenever extraction output changes, so cached text is not reused
+EXTRACTOR_VERSION = "3"
+
+
+def new_extraction_stats():
+    return {
+        "pages_total": 0,
+        "pages_text": 0,
+        "pages_ocr": 0,
+        "pages_ocr_cached": 0,
+        "ocr_seconds": 0.0,
+        "used_ghostscript": False,
+        "ghostscript_pages": 0,
+        "ghostscript_render_seconds": 0.0,
+        "ghostscript_seconds": 0.0,
+        "ocr_error": None,
+        "cache_hit": False,
+    }
+
+
+def extract_text(file_path, file_type, file_hash=None):
+    text, _ = extract_text_with_stats(file_path, file_type, file_hash)
+    return text
+
+
+def extract_text_with_stats(file_path, file_type, file_hash=None, parallel_ocr=True):
+    """
+    Extract text, reusing the on-disk cache when this exact content
+    (same SHA-256) was already extracted by this extractor version.
+    """
+
+    if file_hash is None:
+        file_hash = file_sha256(file_path)
+
+    cached = extraction_cache.get_text(file_hash, EXTRACTOR_VERSION)
+
+    if cached is not None:
+        text, stats = cached
+        stats["cache_hit"] = True
+        print("⚡ Extraction cache hit:", file_hash[:12])
+        return text, stats
+
+    if file_type != "pdf":
+        text, stats = extract_non_pdf(file_path, file_type), new_extraction_stats()
+    else:
+        text, stats = extract_pdf(file_path, file_hash, parallel_ocr)
+
+    if text and text.strip():
+        extraction_cache.put_text(file_hash, EXTRACTOR_VERSION, text, stats)
+
+    return text, stats
+
+
+def ocr_weak_pages(file_path, file_hash, weak_pages, stats, parallel=True):
+
+    ocr_texts = {}
+    missing_pages = []
+
+    for page_number in weak_pages:
+        cached_text = extraction_cache.get_ocr_page(
+            file_hash, page_number, OCR_VERSION
+        )
+        if cached_text is None:
+            missing_pages.append(page_number)
+        else:
+            ocr_texts[page_number] = cached_text
+
+    stats["pages_ocr_cached"] = len(weak_pages) - len(missing_pages)
+
+    if missing_pages:
+        ocr_start = time.perf_counter()
+        fresh_texts = ocr_pdf_pages(file_path, missing_pages, parallel=parallel)
+        stats["ocr_seconds"] = round(time.perf_counter() - ocr_start, 3)
+
+        for page_number, page_text in fresh_texts.items():
+            extraction_cache.put_ocr_page(
+                file_hash, page_number, OCR_VERSION, page_text
+            )
+
+        ocr_texts.update(fresh_texts)
+
+    return ocr_texts
+
+
+def extract_pdf(file_path, file_hash, parallel_ocr=True):
+
+    stats = new_extraction_stats()
+
+    try:
+        # -------------------------------------------------
+        # 1️⃣ Try normal PDF text extraction (per page)
+        # -------------------------------------------------
+        page_texts = {}
+
+        with pdfplumber.open(file_path) as pdf:
+            for page_number, page in enumerate(pdf.pages, start=1):
+                page_texts[page_number] = page.extract_text() or ""
+
+        stats["pages_total"] = len(page_texts)
+
+        # -------------------------------------------------
+        # 2️⃣ OCR only the weak pages (Poppler + Tesseract)
+        # -------------------------------------------------
+        weak_pages = [
+            page_number
+            for page_number, page_text in page_texts.items()
+            if len(page_text.strip()) < MIN_PAGE_TEXT_CHARS
+        ]
+
+        if weak_pages:
+            print(
+                f"⚠ Weak text on {len(weak_pages)}/{len(page_texts)} pages "
+                f"→ Running OCR on those pages"
+            )
+
+            try:
+                ocr_texts = ocr_weak_pages(
+                    file_path, file_hash, weak_pages, stats, parallel=parallel_ocr
+                )
+            except Exception as e:
+                # Missing Tesseract / Poppler must not cost the text layer
+                print("OCR of weak pages failed, keeping pdfplumber text:", e)
+                stats["ocr_error"] = str(e)
+                ocr_texts = {}
+
+            for page_number, ocr_text in ocr_texts.items():
+                # Keep whichever reading actually found more text
+                if len(ocr_text.strip()) > len(page_texts[page_number].strip()):
+                    page_texts[page_number] = ocr_text
+
+            stats["pages_ocr"] = len(ocr_texts)
+
+        stats["pages_text"] = stats["pages_total"] - stats["pages_ocr"]
+
+        text = "".join(
+            page_texts[page_number] + "\n"
+            for page_number in sorted(page_texts)
+            if page_texts[page_number]
+        )
+
+        # -------------------------------------------------
+        # 3️⃣ Still weak → Ghostscript rendering fallback
+        # -------------------------------------------------
+        if len(text.strip()) < 100:
+            print("⚠ OCR weak → Running Ghostscript fallback")
+
+            stats["used_ghostscript"] = True
+
+            gs_text = ghostscript_ocr(file_path, stats, parallel=parallel_ocr)
+
+            if len(gs_text.strip()) > len(text.strip()):
+                text = gs_text
+
+        print(
+            f"📄 Extraction stats: {stats['pages_ocr']}/{stats['pages_total']} "
+            f"pages OCR'd in {stats['ocr_seconds']}s"
+        )
+
+        return text, stats
+
+    except Exception as e:
+        print("PDF extraction error:", e)
+        return "", stats
+
+
+# =====================================================
+# GHOSTSCRIPT FALLBACK (RENDER EVERY PAGE, OCR IN PARALLEL)
+# =====================================================
+
+def ghostscript_ocr(file_path, stats, parallel=True):
+    """
+    Render each page to its own PNG inside a private temp directory
+    (safe with concurrent scraper threads), OCR the pages in parallel
+    and clean up. Timings are recorded in `stats`.
+    """
+
+    start_time = time.perf_counter()
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="gs-render-") as render_dir:
+            output_pattern = os.path.join(render_dir, "page-%04d.png")
+
+            gs_command = [
+                GHOSTSCRIPT_CMD,
+                "-dNOPAUSE",
+                "-dBATCH",
+                "-dSAFER",
+                "-sDEVICE=png16m",
+                "-r300",
+                f"-sOutputFile={output_pattern}",
+                file_path
+            ]
+
+            subprocess.run(gs_command, check=True, capture_output=True)
+
+            render_done = time.perf_counter()
+
+            image_paths = sorted(
+                os.path.join(render_dir, name)
+                for name in os.listdir(render_dir)
+                if name.endswith(".png")
+            )
+
+            page_texts = ocr_images(image_paths, parallel=parallel)
+
+            text = "".join(
+                page_texts[path] + "\n"
+                for path in image_paths
+                if page_texts[path]
+            )
+
+    except (OSError, subprocess.CalledProcessError) as e:
+        print("Ghostscript fallback failed:", e)
+        text = ""
+        image_paths = []
+        render_done = time.perf_counter()
+
+    stats["ghostscript_pages"] = len(image_paths)
+    stats["ghostscript_render_seconds"] = round(render_done - start_time, 3)
+    stats["ghostscript_seconds"] = round(time.perf_counter() - start_time, 3)
+
+    print(
+        f"🖨 Ghostscript fallback: {len(image_paths)} pages in "
+        f"{stats['ghostscript_seconds']}s "
+        f"(render {stats['ghostscript_render_seconds']}s)"
+    )
+
+    return text
+
+
+# =====================================================
+# NON-PDF EXTRACTION
+# =====================================================
+
+def extract_non_pdf(file_path, file_type):
+
+    if file_type == "docx":
+        doc = DocxDocument(file_path)
+        return "\n".join([para.text for para in doc.paragraphs])
+
+    elif file_type == "txt":
+        with open(file_path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    elif file_type == "xml":
+        tree = ET.parse(file_path)
+        root = tree.getroot()
+        return ET.tostring(root, encoding="unicode")
+
+    return ""
+
+
+# =====================================================
+# PROCESS-POOL ENTRY POINT (BULK INGESTION)
+# =====================================================
+
+def extract_in_worker(file_path, file_type, file_hash):
+    # The bulk pool already uses every core, so OCR runs serially here
+    return extract_text_with_stats(
+        file_path, file_type, file_hash, parallel_ocr=False
+    )
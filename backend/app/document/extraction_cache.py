@@ -0,0 +1,235 @@
+import os
+import json
+import argparse
+import threading
+
+
+EXTRACTION_CACHE_DIR = os.getenv("EXTRACTION_CACHE_DIR", os.path.join("cache", "extraction"))
+EXTRACTION_CACHE_MAX_MB = int(os.getenv("EXTRACTION_CACHE_MAX_MB", "512"))
+
+
+# =====================================================
+# ON-DISK CACHE KEYED BY CONTENT HASH + EXTRACTOR VERSION
+# =====================================================
+
+class ExtractionCache:
+    """
+    text/<sha256>-v<version>.json           extracted text + stats
+    ocr/<sha256>-p<page>-v<version>.txt     OCR output of a single page
+
+    Entries are evicted least-recently-used first (by mtime, which is
+    bumped on every hit) once the directory grows past max_bytes.
+    """
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+
+        self._size_bytes = None
+        self._lock = threading.Lock()
+
+    # -------------------------------------------------
+    # Paths
+    # -------------------------------------------------
+
+    def _text_path(self, file_hash, version):
+        return os.path.join(self.root, "text", f"{file_hash}-v{version}.json")
+
+    def _ocr_path(self, file_hash, page_number, version):
+        return os.path.join(
+            self.root, "ocr", f"{file_hash}-p{page_number}-v{version}.txt"
+        )
+
+    # -------------------------------------------------
+    # Extracted text
+    # -------------------------------------------------
+
+    def get_text(self, file_hash, version):
+
+        path = self._text_path(file_hash, version)
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        self._touch(path)
+        return entry["text"], entry["stats"]
+
+    def put_text(self, file_hash, version, text, stats):
+
+        payload = json.dumps({
+            "file_hash": file_hash,
+            "version": version,
+            "text": text,
+            "stats": stats,
+        })
+
+        self._write(self._text_path(file_hash, version), payload)
+
+    # -------------------------------------------------
+    # Per-page OCR output
+    # -------------------------------------------------
+
+    def get_ocr_page(self, file_hash, page_number, version):
+
+        path = self._ocr_path(file_hash, page_number, version)
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except OSError:
+            return None
+
+        self._touch(path)
+        return text
+
+    def put_ocr_page(self, file_hash, page_number, version, text):
+        self._write(self._ocr_path(file_hash, page_number, version), text)
+
+    # -------------------------------------------------
+    # Storage helpers
+    # -------------------------------------------------
+
+    def _write(self, path, payload):
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(payload)
+
+        # Overwriting an entry replaces its bytes rather than adding to them
+        try:
+            replaced_bytes = os.path.getsize(path)
+        except OSError:
+            replaced_bytes = 0
+
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._size_bytes is None:
+                self._size_bytes = self._scan_size()
+            else:
+                self._size_bytes += os.path.getsize(path) - replaced_bytes
+
+            over_limit = self._size_bytes > self.max_bytes
+
+        if over_limit:
+            self.prune()
+
+    def _touch(self, path):
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+    def _entries(self):
+
+        entries = []
+
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith(".tmp"):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+
+        return entries
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def prune(self, max_bytes=None):
+        """
+        Evict least-recently-used entries until the cache fits.
+        """
+
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+
+        removed = 0
+        freed = 0
+
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            freed += size
+            removed += 1
+
+        with self._lock:
+            self._size_bytes = total
+
+        return {"removed": removed, "freed_bytes": freed, "size_bytes": total}
+
+    def clear(self):
+        return self.prune(max_bytes=0)
+
+    def get_stats(self):
+
+        entries = self._entries()
+
+        return {
+            "path": self.root,
+            "entries": len(entries),
+            "size_bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+
+extraction_cache = ExtractionCache(
+    EXTRACTION_CACHE_DIR,
+    EXTRACTION_CACHE_MAX_MB * 1024 * 1024
+)
+
+
+# =====================================================
+# CLI: python -m app.document.extraction_cache ...
+# =====================================================
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Manage the extraction cache")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("stats", help="Show cache size")
+
+    prune_parser = sub.add_parser("prune", help="Evict LRU entries")
+    prune_parser.add_argument(
+        "--max-mb",
+        type=float,
+        default=None,
+        help="Target size in MB (defaults to EXTRACTION_CACHE_MAX_MB)"
+    )
+
+    sub.add_parser("clear", help="Remove every entry")
+
+    args = parser.parse_args()
+
+    if args.command == "stats":
+        print(extraction_cache.get_stats())
+
+    elif args.command == "prune":
+        max_bytes = (
+            int(args.max_mb * 1024 * 1024) if args.max_mb is not None else None
+        )
+        print(extraction_cache.prune(max_bytes=max_bytes))
+
+    elif args.command == "clear":
+        print(extraction_cache.clear())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,841 @@
 import os
+import time
+import threading
 import faiss
 import numpy as np
-from sentence_transformers import SentenceTransformer
 from sqlalchemy.orm import Session
+from app.document.embedder import embed_query
 from app.models.chunk import DocumentChunk
+from app.document.ann_index import (
+    create_empty_index,
+    apply_search_params,
+    describe_index,
+    export_vectors,
+    search_allowed,
+    stored_ids,
+)
+from app.document.vector_log import VectorLog, OP_ADD, OP_DELETE, write_atomic
+from app.document.query_log import QueryLog
+from app.document.mapped_index import MappedIndex, read_index_mmap
+from app.document.tombstoned_index import TombstonedIndex
+from app.document.partitioned_index import FAISS_PARTITIONS, PartitionedIndex
+from app.utils.file_lock import InterProcessLock
+from app.utils.metrics import current_memory_breakdown_mb
+from app.utils.rwlock import ReadWriteLock
 
 FAISS_INDEX_PATH = "faiss.index"
+FAISS_WAL_PATH = FAISS_INDEX_PATH + ".wal"
+FAISS_GENERATION_PATH = FAISS_INDEX_PATH + ".generation"
+FAISS_LOCK_PATH = FAISS_INDEX_PATH + ".lock"
+FAISS_QUERY_LOG_PATH = FAISS_INDEX_PATH + ".queries"
 dimension = 384
 SIMILARITY_THRESHOLD = 1.05  # 🔥 Safe cosine distance cutoff
 
+# Snapshot once this many vectors were added/removed since the last one…
+FAISS_SNAPSHOT_EVERY = int(os.getenv("FAISS_SNAPSHOT_EVERY", "5000"))
+# …and at least this often while there are unsnapshotted changes
+FAISS_SNAPSHOT_INTERVAL_SECONDS = int(os.getenv("FAISS_SNAPSHOT_INTERVAL_SECONDS", "300"))
+
+# Rebuild once this share of stored vectors are tombstones (deleted but
+# still in memory: HNSW graphs, mmapped snapshots)
+FAISS_COMPACT_RATIO = float(os.getenv("FAISS_COMPACT_RATIO", "0.2"))
+
+# Serving workers: map the snapshot read-only (shared page cache) instead
+# of copying it into every process; writes go to a private delta
+FAISS_MMAP = os.getenv("FAISS_MMAP", "0") == "1"
+
+# A failed reload is retried after this long, doubling while it keeps
+# failing (up to FAISS_RELOAD_RETRY_MAX_SECONDS)
+FAISS_RELOAD_RETRY_SECONDS = float(os.getenv("FAISS_RELOAD_RETRY_SECONDS", "1"))
+FAISS_RELOAD_RETRY_MAX_SECONDS = float(os.getenv("FAISS_RELOAD_RETRY_MAX_SECONDS", "60"))
+
+if FAISS_PARTITIONS and FAISS_MMAP:
+    print("[FAISS] FAISS_PARTITIONS keeps private per-partition indexes — FAISS_MMAP ignored")
+    FAISS_MMAP = False
+
+vector_log = VectorLog(FAISS_WAL_PATH)
+query_log = QueryLog(FAISS_QUERY_LOG_PATH, dimension)
+
+# Searches share the index; add/remove/swap take it exclusively
+index_lock = ReadWriteLock("faiss-index")
+
+# Serializes writers so log records land in mutation order, and keeps
+# them out while a snapshot rotates the log (searches are not blocked)
+_write_lock = threading.RLock()
+_snapshot_lock = threading.Lock()
+
+# Same, across worker processes: log appends, snapshots and generation
+# bumps happen under this file lock
+_disk_lock = InterProcessLock(FAISS_LOCK_PATH)
+
+_pending_changes = 0
+_snapshot_thread = None
+_compact_thread = None
+_compactions = 0
+
+# Generation of the on-disk state (snapshot + log) the live index reflects
+_generation = 0
+_generation_seen = None  # stat of the generation file at the last check
+
+# Which snapshot file the live index was loaded from, and how far into the
+# vector log it has applied: other workers' changes are replayed from there
+_snapshot_seen = None
+_log_applied = {}
+_reload_lock = threading.Lock()
+_reload_thread = None
+_reload_retry_at = 0.0     # monotonic time before which no reload is retried
+_reload_failures_in_row = 0
+
+reload_stats = {
+    "reloads": 0,
+    "tail_reloads": 0,  # only the new log records replayed
+    "full_reloads": 0,  # a new snapshot was loaded
+    "failures": 0,
+    "last_reload_seconds": None,
+    "last_reload_at": None,
+}
+
+
 # =====================================================
-# LOAD EMBEDDING MODEL (ONCE)
+# INDEX GENERATION (SHARED BETWEEN WORKERS)
 # =====================================================
 
-model = SentenceTransformer("all-MiniLM-L6-v2")
+def read_generation():
+
+    try:
+        with open(FAISS_GENERATION_PATH) as f:
+            return int(f.read().strip() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def _bump_generation():
+    """Caller holds _disk_lock."""
+
+    generation = read_generation() + 1
+    temp_path = FAISS_GENERATION_PATH + ".tmp"
+
+    # Only a change signal — the data itself is already durable
+    with open(temp_path, "w") as f:
+        f.write(str(generation))
+    os.replace(temp_path, FAISS_GENERATION_PATH)
+
+    return generation
+
+
+def _snapshot_id():
+    """Changes whenever faiss.index is rewritten (write_atomic renames a new file in)."""
+
+    try:
+        st = os.stat(FAISS_INDEX_PATH)
+    except FileNotFoundError:
+        return None
+
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
 
 # =====================================================
 # LOAD OR CREATE FAISS INDEX
 # =====================================================
 
-if os.path.exists(FAISS_INDEX_PATH):
-    index = faiss.read_index(FAISS_INDEX_PATH)
+def _stored_ids(target):
+    if isinstance(target, (MappedIndex, TombstonedIndex, PartitionedIndex)):
+        return target.stored_ids()
+    return stored_ids(target)
+
+
+def _dead_count(target):
+    if isinstance(target, MappedIndex):
+        return len(target.deleted)
+    if isinstance(target, TombstonedIndex):
+        return len(target.dead)
+    return 0
+
+
+def _remove_ids(target, ids):
+    """
+    Delete from `target`; HNSW cannot delete in place → tombstones.
+    Returns (index, removed count) — the index may be a new object.
+    """
+
+    ids = np.asarray(ids, dtype="int64")
+
+    if isinstance(target, (MappedIndex, TombstonedIndex)):
+        return target, target.remove_ids(ids)
+
+    try:
+        return target, target.remove_ids(ids)
+    except RuntimeError:
+        target = TombstonedIndex(target)
+        return target, target.remove_ids(ids)
+
+
+def _replay_log(target, position=None, tail=False):
+    """
+    Apply logged changes on top of the snapshot, advancing `position` (a
+    vector log read position) past them. Replay from the start of the log
+    is idempotent: a crash between writing a snapshot and discarding its
+    log segments leaves records the snapshot already contains, so adds of
+    IDs that are present are skipped. tail=True: `position` is where this
+    index already stands, so the records after it are applied as they are.
+    """
+
+    position = {} if position is None else position
+
+    present = None
+    added = removed = 0
+
+    for op, ids, vectors in vector_log.records(position):
+
+        if present is None and not tail:
+            present = set(_stored_ids(target).tolist())
+
+        if op == OP_ADD:
+            if vectors.shape[1] != dimension:
+                raise ValueError(f"Vector log dimension {vectors.shape[1]} != {dimension}")
+
+            if tail:
+                target.add_with_ids(vectors, ids)
+                added += len(ids)
+                continue
+
+            mask = np.fromiter((int(i) not in present for i in ids), dtype=bool, count=len(ids))
+            if mask.any():
+                target.add_with_ids(vectors[mask], ids[mask])
+                present.update(ids[mask].tolist())
+                added += int(mask.sum())
+
+        elif op == OP_DELETE:
+            if not tail:
+                ids = [int(i) for i in ids if int(i) in present]
+                present.difference_update(ids)
+            if len(ids):
+                target, count = _remove_ids(target, ids)
+                removed += count
+
+    return target, added, removed
+
+
+def _load_from_disk(mmap=FAISS_MMAP, position=None):
+    """
+    Snapshot + vector log → a new index object (the live one is not
+    touched). Caller holds _disk_lock so no worker appends or snapshots
+    meanwhile. Returns (index, replayed adds, replayed deletes); the log
+    read position reached is stored in `position` if given.
+    """
+
+    loaded = MappedIndex(FAISS_INDEX_PATH) if mmap else faiss.read_index(FAISS_INDEX_PATH)
 
     # Safety dimension check
-    if index.d != dimension:
+    if loaded.d != dimension:
         raise ValueError(
             f"FAISS dimension mismatch. "
-            f"Index: {index.d}, Expected: {dimension}"
+            f"Index: {loaded.d}, Expected: {dimension}"
         )
-else:
-    base_index = faiss.IndexFlatL2(dimension)
-    index = faiss.IndexIDMap(base_index)
-    faiss.write_index(index, FAISS_INDEX_PATH)
+
+    # nprobe / efSearch are not stored in the file
+    if not mmap:
+        apply_search_params(loaded)
+
+    if position is not None:
+        position.clear()
+
+    return _replay_log(loaded, position)
+
+
+def _serving(loaded):
+    """What searches run against: per-partition indexes with FAISS_PARTITIONS."""
+
+    if not FAISS_PARTITIONS:
+        return loaded
+
+    if isinstance(loaded, TombstonedIndex):
+        ids, vectors = export_vectors(loaded.inner)
+        live = ~np.isin(ids, list(loaded.dead))
+        ids, vectors = ids[live], vectors[live]
+    else:
+        ids, vectors = export_vectors(loaded)
+
+    return PartitionedIndex.from_vectors(loaded.d, ids, vectors)
+
+
+_load_started = time.perf_counter()
+_memory_before = current_memory_breakdown_mb()
+
+with _disk_lock:
+    if not os.path.exists(FAISS_INDEX_PATH):
+        # Type from FAISS_INDEX_TYPE (flat / ivf / hnsw), see ann_index.py
+        write_atomic(
+            faiss.serialize_index(create_empty_index(dimension)).tobytes(),
+            FAISS_INDEX_PATH
+        )
+
+    _generation = read_generation()
+    _snapshot_seen = _snapshot_id()
+    index, *_replayed = _load_from_disk(position=_log_applied)
+
+    # New appends go to a fresh segment, never after a torn tail
+    vector_log.rotate()
+
+index = _serving(index)
+
+if any(_replayed):
+    _pending_changes = sum(_replayed)
+    print(f"[FAISS] Replayed vector log: +{_replayed[0]} / -{_replayed[1]} vectors")
+
+_memory_after = current_memory_breakdown_mb()
+
+load_stats = {
+    "mmap": FAISS_MMAP,
+    "load_seconds": round(time.perf_counter() - _load_started, 4),
+    "vectors": index.ntotal,
+    "rss_anon_delta_mb": (
+        round(_memory_after["rss_anon"] - _memory_before["rss_anon"], 1)
+        if "rss_anon" in _memory_after and "rss_anon" in _memory_before else None
+    ),
+}
+
+print(
+    f"[FAISS] Loaded {load_stats['vectors']} vectors "
+    f"({'mmap' if FAISS_MMAP else 'in memory'}) in {load_stats['load_seconds']}s, "
+    f"private RSS +{load_stats['rss_anon_delta_mb']} MB, generation {_generation}"
+)
+
+
+# =====================================================
+# HOT RELOAD (CHANGES MADE BY OTHER WORKERS)
+# =====================================================
+
+def _catch_up():
+    """
+    Bring the live index up to the on-disk generation. Caller holds
+    _write_lock and _disk_lock. Changes other workers appended are
+    replayed from this worker's log position (cost ∝ the new records);
+    only a new snapshot — written by a snapshot, compaction or rebuild —
+    means loading everything again. Returns "tail", "full" or None
+    (already current).
+    """
+
+    global index, _generation, _snapshot_seen, _log_applied
+
+    generation = read_generation()
+    if generation == _generation:
+        return None
+
+    snapshot = _snapshot_id()
+
+    if snapshot == _snapshot_seen:
+        position = dict(_log_applied)
+        records = list(vector_log.records(dict(position)))
+
+        # Partition keys are looked up before searches are held up
+        if isinstance(index, PartitionedIndex):
+            index.prefetch_keys([int(i) for op, ids, _ in records if op == OP_ADD for i in ids])
+
+        with index_lock.write():
+            index, _, _ = _replay_log(index, position, tail=True)
+
+        mode = "tail"
+    else:
+        position = {}
+        fresh, _, _ = _load_from_disk(position=position)
+        fresh = _serving(fresh)
+
+        with index_lock.write():
+            index = fresh
+
+        _snapshot_seen = snapshot
+        mode = "full"
+
+    _log_applied = position
+    _generation = generation
+
+    return mode
+
+
+def reload_index():
+    """
+    Apply what other workers changed on disk. Searches keep running on
+    the current index except while a tail is applied / a reload swapped
+    in. Returns False if already up to date.
+    """
+
+    started = time.perf_counter()
+
+    with _write_lock, _disk_lock:
+        mode = _catch_up()
+
+    if mode is None:
+        return False
+
+    seconds = round(time.perf_counter() - started, 4)
+
+    with _reload_lock:
+        reload_stats["reloads"] += 1
+        reload_stats[f"{mode}_reloads"] += 1
+        reload_stats["last_reload_seconds"] = seconds
+        reload_stats["last_reload_at"] = time.time()
+
+    print(f"[FAISS] Reloaded generation {_generation} ({mode}, {index.ntotal} vectors) "
+          f"in {seconds}s")
+    return True
+
+
+def _reload_loop():
+
+    global _reload_thread, _generation_seen, _reload_retry_at, _reload_failures_in_row
+
+    while True:
+        try:
+            reload_index()
+        except Exception as e:
+            with _reload_lock:
+                reload_stats["failures"] += 1
+                _reload_failures_in_row += 1
+
+                # Forget the generation stat so a later search retries,
+                # once the backoff has passed
+                delay = min(
+                    FAISS_RELOAD_RETRY_SECONDS * 2 ** (_reload_failures_in_row - 1),
+                    FAISS_RELOAD_RETRY_MAX_SECONDS
+                )
+                _generation_seen = None
+                _reload_retry_at = time.monotonic() + delay
+                _reload_thread = None
+
+            print(f"[FAISS] Reload failed (retrying in {delay:g}s):", e)
+            return
+
+        # Another change may have landed while loading
+        with _reload_lock:
+            _reload_failures_in_row = 0
+
+            if read_generation() == _generation:
+                _reload_thread = None
+                return
+
+
+def _check_generation():
+    """
+    Called on every search: one stat() of the generation file. A change
+    made by another worker starts a background reload.
+    """
+
+    global _generation_seen, _reload_thread
+
+    # Backing off after a failed reload
+    if time.monotonic() < _reload_retry_at:
+        return
+
+    try:
+        st = os.stat(FAISS_GENERATION_PATH)
+    except FileNotFoundError:
+        return
+
+    seen = (st.st_ino, st.st_mtime_ns, st.st_size)
+    if seen == _generation_seen:
+        return
+    _generation_seen = seen
+
+    if read_generation() == _generation:
+        return
+
+    with _reload_lock:
+        if _reload_thread is not None:
+            return
+
+        _reload_thread = threading.Thread(
+            target=_reload_loop,
+            name="faiss-reload",
+            daemon=True
+        )
+        _reload_thread.start()
+
+
+def get_generation_stats():
+
+    with _reload_lock:
+        stats = dict(reload_stats)
+
+    return {
+        "loaded": _generation,
+        "on_disk": read_generation(),
+        "reload_in_progress": _reload_thread is not None,
+        **stats,
+    }
 
 
 def get_index():
+    """
+    The live index — for metadata (d, ntotal) only. Search through
+    search_index() and write through add_vectors()/remove_vectors().
+    """
     return index
 
 
+def search_index(queries, k, department=None, semester=None, allowed_ids=None):
+    """
+    Concurrent-safe search: many searches at once, never during a write.
+
+    allowed_ids (a set of chunk IDs) is pushed into FAISS as an
+    IDSelector: the k nearest *allowed* vectors come back, nothing else.
+    With FAISS_PARTITIONS, department / semester also restrict the search
+    to the matching partitions; otherwise they are ignored.
+    """
+
+    _check_generation()
+
+    with index_lock.read():
+        if isinstance(index, PartitionedIndex) and (department is not None or semester is not None):
+            return index.search_partitions(
+                queries, k, index.keys_matching(department, semester), allowed_ids
+            )
+
+        if allowed_ids is None:
+            return index.search(queries, k)
+
+        if isinstance(index, (MappedIndex, TombstonedIndex, PartitionedIndex)):
+            return index.search(queries, k, allowed_ids=allowed_ids)
+
+        return search_allowed(index, queries, k, allowed_ids)
+
+
+# =====================================================
+# WRITES (LOGGED) AND SNAPSHOTS
+# =====================================================
+
+def add_vectors(embeddings, ids):
+    """Add to the live index and append to the vector log (durable)."""
+
+    global _pending_changes, _generation
+
+    ids = np.asarray(ids, dtype="int64")
+
+    if isinstance(index, PartitionedIndex):
+        index.prefetch_keys(ids)
+
+    with _write_lock, _disk_lock:
+        # Other workers' changes first, so the log position stays exact
+        _catch_up()
+
+        with index_lock.write():
+            index.add_with_ids(embeddings, ids)
+
+        # fsync happens outside the index lock: searches are not held up
+        _log_applied.update(vector_log.append_add(ids, embeddings))
+        _pending_changes += len(ids)
+
+        _generation = _bump_generation()
+
+
+def remove_vectors(ids, compact=True):
+    """
+    Remove vectors by ID (IndexIDMap). Returns how many were removed.
+    Starts a background compaction once tombstones pass
+    FAISS_COMPACT_RATIO, unless `compact` is False (the caller compacts).
+    """
+
+    global index, _pending_changes, _generation
+
+    if len(ids) == 0:
+        return 0
+
+    with _write_lock, _disk_lock:
+        _catch_up()
+
+        with index_lock.write():
+            index, removed = _remove_ids(index, ids)
+
+        _log_applied.update(vector_log.append_delete(np.asarray(ids, dtype="int64")))
+        _pending_changes += len(ids)
+
+        _generation = _bump_generation()
+
+    if compact and _dead_ratio() >= FAISS_COMPACT_RATIO:
+        start_compaction()
+
+    return removed
+
+
+def snapshot_index(compact=False):
+    """
+    Fold the vector log into a new snapshot: snapshot + log are loaded
+    into a private index, written atomically (temp file + rename), and
+    the log segments it contains are dropped. Works from disk, so any
+    worker can snapshot changes made by the others. Writers in every
+    worker wait for it; searches do not.
+
+    Tombstones are rebuilt away when `compact` is set or they make up
+    FAISS_COMPACT_RATIO of the index; otherwise they are carried over
+    as a delete record in the fresh log segment.
+    """
+
+    global index, _pending_changes, _generation, _compactions, _snapshot_seen, _log_applied
+
+    with _snapshot_lock, _write_lock, _disk_lock:
+        if (
+            (_pending_changes == 0 and not compact) or vector_log.size_bytes() == 0
+        ) and os.path.exists(FAISS_INDEX_PATH):
+            _pending_changes = 0
+            return False
+
+        up_to_date = read_generation() == _generation
+        sealed_seq = vector_log.rotate()
+
+        full, added, removed = _load_from_disk(mmap=False)
+        dead = _dead_count(full)
+
+        if dead and (compact or dead / (full.ntotal + dead) >= FAISS_COMPACT_RATIO):
+            full = full.compacted()
+            apply_search_params(full)
+            _compactions += 1
+            print(f"[FAISS] Compacted away {dead} tombstoned vectors")
+            dead = 0
+
+        # Log position of the new snapshot: only the carried-over tombstones
+        position = {}
+
+        if isinstance(full, TombstonedIndex):
+            write_atomic(faiss.serialize_index(full.inner).tobytes(), FAISS_INDEX_PATH)
+            # Before the sealed segments go: a crash in between replays both
+            position = vector_log.append_delete(np.array(sorted(full.dead), dtype="int64")) or {}
+        else:
+            write_atomic(faiss.serialize_index(full).tobytes(), FAISS_INDEX_PATH)
+
+        if sealed_seq is not None:
+            vector_log.discard_sealed(sealed_seq)
+
+        generation = _bump_generation()
+        _pending_changes = 0
+
+        # Other workers pick the new file up through the generation
+        if up_to_date:
+            if FAISS_MMAP:
+                # Remap: drops the private delta
+                tombstones = sorted(full.dead) if isinstance(full, TombstonedIndex) else []
+                full = MappedIndex(FAISS_INDEX_PATH)
+                full.remove_ids(tombstones)
+
+            # Partitions already hold exactly the live vectors
+            if not FAISS_PARTITIONS:
+                with index_lock.write():
+                    index = full
+            _generation = generation
+            _snapshot_seen = _snapshot_id()
+            _log_applied = position
+
+    print(f"[FAISS] Snapshot written ({full.ntotal} vectors, +{added} / -{removed}, "
+          f"{dead} tombstones), generation {generation}")
+    return True
+
+
+def compact_index():
+    """Snapshot now and rebuild without tombstones."""
+    return snapshot_index(compact=True)
+
+
+def _compact_in_background():
+
+    global _compact_thread
+
+    try:
+        compact_index()
+    except Exception as e:
+        print("[FAISS] Compaction failed:", e)
+    finally:
+        _compact_thread = None
+
+
+def start_compaction():
+
+    global _compact_thread
+
+    with _reload_lock:
+        if _compact_thread is not None:
+            return
+
+        _compact_thread = threading.Thread(
+            target=_compact_in_background,
+            name="faiss-compact",
+            daemon=True
+        )
+        _compact_thread.start()
+
+
 def save_index():
-    faiss.write_index(index, FAISS_INDEX_PATH)
+    """
+    Changes are already durable in the vector log; only write a full
+    snapshot once FAISS_SNAPSHOT_EVERY changes have accumulated.
+    """
+
+    if _pending_changes >= FAISS_SNAPSHOT_EVERY:
+        snapshot_index()
+
+
+def replace_index(new_index, since=None):
+    """
+    Swap in a rebuilt index and persist it as the new snapshot.
+
+    since: the position writable_copy() returned with the rebuild's
+    source. Vectors other workers logged after it are replayed into
+    `new_index` before the log is cleared; if faiss.index itself was
+    rewritten meanwhile (snapshot / compaction) those records are gone
+    from the log, so the rebuild is refused.
+    """
+
+    global index, _pending_changes, _generation, _snapshot_seen, _log_applied
+
+    with _snapshot_lock, _write_lock, _disk_lock:
+        if since is not None:
+            snapshot, position = since
+
+            if _snapshot_id() != snapshot:
+                raise RuntimeError(
+                    "faiss.index was rewritten while rebuilding (snapshot or compaction "
+                    "by a worker) — run the rebuild again"
+                )
+
+            new_index, added, removed = _replay_log(new_index, dict(position), tail=True)
+
+            # HNSW deletes come back as tombstones; the snapshot must not hold them
+            if isinstance(new_index, TombstonedIndex):
+                new_index = new_index.compacted()
+
+            if added or removed:
+                print(f"[FAISS] Applied changes made during the rebuild: +{added} / -{removed} vectors")
+
+        write_atomic(faiss.serialize_index(new_index).tobytes(), FAISS_INDEX_PATH)
+        vector_log.clear()
+        _pending_changes = 0
+        _snapshot_seen = _snapshot_id()
+        _log_applied = {}
+
+        if FAISS_MMAP:
+            new_index = MappedIndex(FAISS_INDEX_PATH)
+        else:
+            apply_search_params(new_index)
+            new_index = _serving(new_index)
+
+        with index_lock.write():
+            index = new_index
+
+        _generation = _bump_generation()
+
+
+def writable_copy():
+    """
+    A private faiss index with the current contents (for rebuilds), and
+    the on-disk position it reflects — pass that to replace_index() so
+    changes logged while rebuilding are not lost.
+    """
+
+    with _write_lock:
+        with _disk_lock:
+            _catch_up()
+
+        since = (_snapshot_seen, dict(_log_applied))
+
+        with index_lock.read():
+            if isinstance(index, MappedIndex):
+                return index.materialize(), since
+            if isinstance(index, TombstonedIndex):
+                return index.compacted(), since
+            if isinstance(index, PartitionedIndex):
+                return index.merged(), since
+            return index, since
+
+
+def describe_current_index():
+
+    with index_lock.read():
+        if isinstance(index, MappedIndex):
+            info = describe_index(index.base)
+            info.update(index.describe())
+            info["ntotal"] = index.ntotal
+        elif isinstance(index, PartitionedIndex):
+            info = {"type": "partitioned", "ntotal": index.ntotal, "dimension": index.d, "mmap": False}
+            info.update(index.describe())
+            # The float32 partitions are built from this on-disk index
+            info["snapshot"] = describe_index(read_index_mmap(FAISS_INDEX_PATH))
+        elif isinstance(index, TombstonedIndex):
+            info = describe_index(index.inner)
+            info["ntotal"] = index.ntotal
+            info["mmap"] = False
+        else:
+            info = describe_index(index)
+            info["mmap"] = False
+
+        info["tombstones"] = _dead_count(index)
+
+    info["generation"] = _generation
+    return info
+
+
+def _dead_ratio():
+
+    dead = _dead_count(index)
+    return dead / (index.ntotal + dead) if dead else 0.0
+
+
+def get_vector_counts():
+    """Live vectors vs tombstones still held in memory."""
+
+    with index_lock.read():
+        live = index.ntotal
+        dead = _dead_count(index)
+
+    return {
+        "live": live,
+        "dead": dead,
+        "dead_ratio": round(dead / (live + dead), 4) if dead else 0.0,
+        "compact_at_ratio": FAISS_COMPACT_RATIO,
+        "compactions": _compactions,
+    }
+
+
+def live_vector_ids():
+    with index_lock.read():
+        return _stored_ids(index)
+
+
+def get_persistence_stats():
+    return {
+        "pending_changes": _pending_changes,
+        "log_bytes": vector_log.size_bytes(),
+        "log_segments": len(vector_log.segments()),
+        "snapshot_every": FAISS_SNAPSHOT_EVERY,
+        "snapshot_interval_seconds": FAISS_SNAPSHOT_INTERVAL_SECONDS,
+        "load": load_stats,
+        "generation": get_generation_stats(),
+        "vectors": get_vector_counts(),
+    }
+
+
+def _snapshot_loop():
+
+    while True:
+        time.sleep(FAISS_SNAPSHOT_INTERVAL_SECONDS)
+
+        try:
+            snapshot_index()
+        except Exception as e:
+            print("[FAISS] Snapshot failed:", e)
+
+
+def start_index_snapshots():
+
+    global _snapshot_thread
+
+    if _snapshot_thread is not None:
+        return
+
+    _snapshot_thread = threading.Thread(
+        target=_snapshot_loop,
+        name="faiss-snapshot",
+        daemon=True
+    )
+    _snapshot_thread.start()
+
 
 
 # =====================================================
@@ -57,15 +853,10 @@ def search_similar_chunks(question: str, db: Session, top_k: int = 5):
         return []
 
     # 🔥 Normalize embeddings (important for cosine-style behavior)
-    query_vector = model.encode(
-        [question],
-        normalize_embeddings=True
-    )
-
-    query_vector = np.array(query_vector).astype("float32")
+    query_vector = embed_query(question)
 
     # Search more than needed (for filtering)
-    distances, ids = index.search(query_vector, top_k * 3)
+    distances, ids = search_index(query_vector, top_k * 3)
 
     # 🔥 DEBUG: Print raw FAISS output
     print("Distances:", distances)
@@ -0,0 +1,143 @@
+import faiss
+import numpy as np
+
+from app.document.ann_index import (
+    apply_search_params,
+    export_vectors,
+    id_selector,
+    merge_results,
+    rebuild_without,
+    search_allowed,
+    search_parameters,
+    stored_ids,
+)
+
+
+# Shared, read-only mapping of the codes (flat, HNSW, SQ/PQ, IVF lists)
+MMAP_READ_FLAGS = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+
+
+def read_index_mmap(path):
+    index = faiss.read_index(path, MMAP_READ_FLAGS)
+    apply_search_params(index)
+    return index
+
+
+# =====================================================
+# MEMORY-MAPPED SERVING INDEX
+# =====================================================
+
+class MappedIndex:
+    """
+    A snapshot opened memory-mapped and read-only (pages shared through
+    the OS page cache between worker processes) plus the writer path:
+    vectors added since the snapshot live in a small private flat index,
+    IDs deleted from the snapshot are tombstones that searches skip.
+    Exposes the parts of the faiss Index API the app uses (d, ntotal,
+    search, add_with_ids, remove_ids). materialize() folds everything into
+    a private, writable index for the next snapshot.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.base = read_index_mmap(path)
+        self.d = self.base.d
+
+        self.delta = faiss.IndexIDMap(faiss.IndexFlatL2(self.d))
+        self.deleted = set()
+
+        self._base_ids = None  # loaded on first delete
+        self._params = None    # IDSelector skipping `deleted`
+
+    @property
+    def ntotal(self):
+        return self.base.ntotal - len(self.deleted) + self.delta.ntotal
+
+    def _in_base(self, ids):
+
+        if self._base_ids is None:
+            self._base_ids = set(stored_ids(self.base).tolist())
+
+        return [i for i in ids if i in self._base_ids]
+
+    # -------------------------------------------------
+    # Writer path (never touches the mapped snapshot)
+    # -------------------------------------------------
+
+    def add_with_ids(self, vectors, ids):
+        self.delta.add_with_ids(vectors, ids)
+
+    def remove_ids(self, ids):
+
+        ids = [int(i) for i in np.asarray(ids).ravel()]
+
+        removed = self.delta.remove_ids(np.asarray(ids, dtype="int64"))
+
+        newly_deleted = [i for i in self._in_base(ids) if i not in self.deleted]
+        if newly_deleted:
+            self.deleted.update(newly_deleted)
+            self._params = search_parameters(self.base, id_selector(self.deleted, exclude=True))
+
+        return removed + len(newly_deleted)
+
+    def stored_ids(self):
+
+        base_ids = stored_ids(self.base)
+
+        if self.deleted:
+            base_ids = base_ids[~np.isin(base_ids, list(self.deleted))]
+
+        return np.concatenate([base_ids, stored_ids(self.delta)])
+
+    # -------------------------------------------------
+    # Search
+    # -------------------------------------------------
+
+    def search(self, queries, k, allowed_ids=None):
+        """allowed_ids: only these IDs may be returned (filter pushdown)."""
+
+        if allowed_ids is not None:
+            distances, ids = search_allowed(self.base, queries, k, set(allowed_ids) - self.deleted)
+        elif self._params is not None:
+            distances, ids = self.base.search(queries, k, params=self._params)
+        else:
+            distances, ids = self.base.search(queries, k)
+
+        if not self.delta.ntotal:
+            return distances, ids
+
+        if allowed_ids is not None:
+            delta_results = search_allowed(self.delta, queries, min(k, self.delta.ntotal), allowed_ids)
+        else:
+            delta_results = self.delta.search(queries, min(k, self.delta.ntotal))
+
+        return merge_results([(distances, ids), delta_results], k)
+
+    # -------------------------------------------------
+    # Snapshot support
+    # -------------------------------------------------
+
+    def materialize(self):
+        """Private, writable copy of snapshot + delta − deleted."""
+
+        full = faiss.read_index(self.path)
+
+        if self.deleted:
+            try:
+                full.remove_ids(np.array(sorted(self.deleted), dtype="int64"))
+            except RuntimeError:
+                full, _ = rebuild_without(full, sorted(self.deleted))
+
+        if self.delta.ntotal:
+            ids, vectors = export_vectors(self.delta)
+            full.add_with_ids(vectors, ids)
+
+        return full
+
+    def describe(self):
+        return {
+            "mmap": True,
+            "snapshot_vectors": self.base.ntotal,
+            "delta_vectors": self.delta.ntotal,
+            "deleted_from_snapshot": len(self.deleted),
+        }
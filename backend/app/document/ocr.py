@@ -0,0 +1,165 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import pytesseract
+from pdf2image import convert_from_path, pdfinfo_from_path
+
+
+# =====================================================
+# CONFIGURE EXTERNAL TOOLS (UPDATE PATHS IF NEEDED)
+# =====================================================
+
+POPPLER_PATH = r"C:\poppler-25.12.0\Library\bin"
+TESSERACT_PATH = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+
+pytesseract.pytesseract.tesseract_cmd = TESSERACT_PATH
+
+OCR_DPI = 300
+
+# Bump when OCR settings change, so cached page OCR is not reused
+OCR_VERSION = "1"
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(os.cpu_count() or 1)))
+
+# Upper bound on pages rendered/being OCR'd at once (caps memory)
+OCR_MAX_INFLIGHT_PAGES = int(
+    os.getenv("OCR_MAX_INFLIGHT_PAGES", str(OCR_WORKERS * 2))
+)
+
+
+# =====================================================
+# SHARED PROCESS POOL
+# =====================================================
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=OCR_WORKERS)
+        return _pool
+
+
+def _reset_pool():
+
+    global _pool
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+# =====================================================
+# SINGLE PAGE (RUNS IN A WORKER PROCESS)
+# =====================================================
+
+def ocr_page(file_path, page_number, dpi=OCR_DPI):
+
+    # Render only this page, so a worker never holds more than one image
+    images = convert_from_path(
+        file_path,
+        dpi=dpi,
+        first_page=page_number,
+        last_page=page_number,
+        poppler_path=POPPLER_PATH
+    )
+
+    return "".join(
+        pytesseract.image_to_string(img, lang="eng")
+        for img in images
+    )
+
+
+def get_page_count(file_path):
+    info = pdfinfo_from_path(file_path, poppler_path=POPPLER_PATH)
+    return int(info["Pages"])
+
+
+# =====================================================
+# MANY PAGES (PARALLEL, BOUNDED, ORDER-PRESERVING)
+# =====================================================
+
+def ocr_pdf_pages(file_path, page_numbers=None, parallel=True):
+    """
+    OCR the given 1-based pages (all pages by default).
+    Returns {page_number: text}; callers join in page order.
+    """
+
+    if page_numbers is None:
+        page_numbers = range(1, get_page_count(file_path) + 1)
+
+    return _ocr_many(
+        ocr_page,
+        [(page, (file_path, page)) for page in page_numbers],
+        parallel
+    )
+
+
+def ocr_image(image_path):
+    return pytesseract.image_to_string(image_path, lang="eng")
+
+
+def ocr_images(image_paths, parallel=True):
+    """
+    OCR already-rendered page images. Returns {image_path: text}.
+    """
+
+    return _ocr_many(
+        ocr_image,
+        [(path, (path,)) for path in image_paths],
+        parallel
+    )
+
+
+def _ocr_many(func, keyed_args, parallel):
+
+    if not keyed_args:
+        return {}
+
+    if not parallel or OCR_WORKERS <= 1 or len(keyed_args) == 1:
+        return {key: func(*args) for key, args in keyed_args}
+
+    try:
+        return _run_on_pool(func, keyed_args)
+    except BrokenProcessPool:
+        print("⚠ OCR process pool broke → retrying pages serially")
+        _reset_pool()
+        return {key: func(*args) for key, args in keyed_args}
+
+
+def _run_on_pool(func, keyed_args):
+
+    pool = _get_pool()
+    max_inflight = max(1, OCR_MAX_INFLIGHT_PAGES)
+
+    results = {}
+    pending = {}
+    remaining = iter(keyed_args)
+
+    def submit_next():
+        item = next(remaining, None)
+        if item is None:
+            return False
+        key, args = item
+        pending[pool.submit(func, *args)] = key
+        return True
+
+    while len(pending) < max_inflight and submit_next():
+        pass
+
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+        for future in done:
+            key = pending.pop(future)
+            results[key] = future.result()
+            submit_next()
+
+    return results
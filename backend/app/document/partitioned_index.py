@@ -0,0 +1,210 @@
+import os
+from collections import defaultdict
+
+import faiss
+import numpy as np
+from sqlalchemy.exc import OperationalError
+
+from app.database import SessionLocal
+from app.models.chunk import DocumentChunk
+from app.models.document import Document
+from app.document.ann_index import (
+    MISSING_DISTANCE,
+    id_selector,
+    merge_results,
+    search_parameters,
+    stored_ids,
+)
+
+
+# Serve searches from one index per (department, semester) instead of a
+# single global index; filtered questions then only scan their slice
+FAISS_PARTITIONS = os.getenv("FAISS_PARTITIONS", "0") == "1"
+
+# Vectors whose chunk row is missing (orphans) — only global searches see them
+UNPARTITIONED = (None, None)
+
+# Stay under SQLite's bound-parameter limit
+LOOKUP_BATCH_SIZE = 900
+
+
+def lookup_partition_keys(ids):
+    """chunk id → (department, semester) of its document."""
+
+    ids = [int(i) for i in ids]
+    keys = {}
+
+    db = SessionLocal()
+
+    try:
+        for start in range(0, len(ids), LOOKUP_BATCH_SIZE):
+            rows = db.query(
+                DocumentChunk.id, Document.department, Document.semester
+            ).join(Document).filter(
+                DocumentChunk.id.in_(ids[start:start + LOOKUP_BATCH_SIZE])
+            ).all()
+
+            keys.update({chunk_id: (department, semester) for chunk_id, department, semester in rows})
+    except OperationalError as e:
+        # Index loaded before the tables exist (fresh database)
+        print("[FAISS] Partition lookup failed, vectors left unpartitioned:", e)
+    finally:
+        db.close()
+
+    return keys
+
+
+def partition_label(key):
+    department, semester = key
+    return f"{department or '-'}/sem{semester if semester is not None else '-'}"
+
+
+# =====================================================
+# PARTITIONED SERVING INDEX
+# =====================================================
+
+class PartitionedIndex:
+    """
+    One exact (flat) index per (department, semester) built from the
+    snapshot + log contents. search() scans every partition and merges
+    (a global question); search_partitions() scans only the matching
+    ones. Exposes the same parts of the faiss Index API as MappedIndex.
+    The on-disk snapshot stays a single index of FAISS_INDEX_TYPE.
+    """
+
+    def __init__(self, d, key_lookup=lookup_partition_keys):
+        self.d = d
+        self.partitions = {}
+        self._key_of = {}
+        self._key_lookup = key_lookup
+        self._prefetched = {}
+
+    @classmethod
+    def from_vectors(cls, d, ids, vectors, key_lookup=lookup_partition_keys):
+        partitioned = cls(d, key_lookup)
+        partitioned.add_with_ids(vectors, ids)
+        return partitioned
+
+    @property
+    def ntotal(self):
+        return sum(partition.ntotal for partition in self.partitions.values())
+
+    def keys_matching(self, department=None, semester=None):
+        return [
+            key for key in self.partitions
+            if key != UNPARTITIONED
+            and (department is None or key[0] == department)
+            and (semester is None or key[1] == semester)
+        ]
+
+    # -------------------------------------------------
+    # Writes
+    # -------------------------------------------------
+
+    def prefetch_keys(self, ids):
+        """Look partition keys up before taking the index write lock."""
+        self._prefetched.update(self._key_lookup(ids))
+
+    def add_with_ids(self, vectors, ids):
+
+        ids = np.asarray(ids, dtype="int64")
+        vectors = np.ascontiguousarray(vectors, dtype="float32")
+
+        missing = [int(i) for i in ids if int(i) not in self._prefetched]
+        if missing:
+            self._prefetched.update(self._key_lookup(missing))
+
+        groups = defaultdict(list)
+        for position, chunk_id in enumerate(ids.tolist()):
+            groups[self._prefetched.pop(chunk_id, UNPARTITIONED)].append(position)
+
+        for key, positions in groups.items():
+            partition = self.partitions.get(key)
+            if partition is None:
+                partition = self.partitions[key] = faiss.IndexIDMap(faiss.IndexFlatL2(self.d))
+
+            partition.add_with_ids(vectors[positions], ids[positions])
+            self._key_of.update((int(i), key) for i in ids[positions])
+
+    def remove_ids(self, ids):
+
+        groups = defaultdict(list)
+        for chunk_id in np.asarray(ids).ravel().tolist():
+            key = self._key_of.pop(int(chunk_id), None)
+            if key is not None:
+                groups[key].append(int(chunk_id))
+
+        removed = 0
+        for key, key_ids in groups.items():
+            partition = self.partitions[key]
+            removed += partition.remove_ids(np.asarray(key_ids, dtype="int64"))
+            if partition.ntotal == 0:
+                del self.partitions[key]
+
+        return removed
+
+    def stored_ids(self):
+
+        if not self.partitions:
+            return np.empty(0, dtype="int64")
+
+        return np.concatenate([stored_ids(p) for p in self.partitions.values()])
+
+    # -------------------------------------------------
+    # Search
+    # -------------------------------------------------
+
+    def search_partitions(self, queries, k, keys, allowed_ids=None):
+
+        # Flat partitions: the same selector works for all of them
+        params = (
+            search_parameters(self.partitions[keys[0]], id_selector(allowed_ids))
+            if allowed_ids is not None and keys else None
+        )
+
+        results = [
+            self.partitions[key].search(queries, min(k, self.partitions[key].ntotal), params=params)
+            for key in keys
+            if key in self.partitions
+        ]
+
+        if not results:
+            return (
+                np.full((len(queries), k), MISSING_DISTANCE, dtype="float32"),
+                np.full((len(queries), k), -1, dtype="int64"),
+            )
+
+        return merge_results(results, k)
+
+    def search(self, queries, k, allowed_ids=None):
+        return self.search_partitions(queries, k, list(self.partitions), allowed_ids)
+
+    # -------------------------------------------------
+    # Snapshot / rebuild support
+    # -------------------------------------------------
+
+    def merged(self):
+        """A single flat index with every partition's vectors."""
+
+        merged = faiss.IndexIDMap(faiss.IndexFlatL2(self.d))
+
+        for partition in self.partitions.values():
+            flat = faiss.downcast_index(partition.index)
+            merged.add_with_ids(flat.reconstruct_n(0, partition.ntotal), stored_ids(partition))
+
+        return merged
+
+    def describe(self):
+
+        sizes = sorted(
+            ((partition_label(key), partition.ntotal) for key, partition in self.partitions.items()),
+            key=lambda item: -item[1]
+        )
+
+        return {
+            "partitions": len(sizes),
+            "largest_partitions": dict(sizes[:10]),
+            "unpartitioned_vectors": (
+                self.partitions[UNPARTITIONED].ntotal if UNPARTITIONED in self.partitions else 0
+            ),
+        }
@@ -1,131 +1,46 @@
 import re
-import os
-import subprocess
-import pdfplumber
-import pytesseract
-from pdf2image import convert_from_path
-from docx import Document as DocxDocument
-import xml.etree.ElementTree as ET
-from sentence_transformers import SentenceTransformer
-import numpy as np
+from collections import deque
 
-from app.document.faiss_manager import get_index, save_index
+import numpy as np
+from sqlalchemy import insert, update, delete
+
+from app.document.embedder import get_model, EMBEDDING_MODEL_NAME
+from app.document.embedding_store import (
+    chunk_text_hash,
+    load_embeddings,
+    store_embeddings,
+)
+from app.document.faiss_manager import get_index, save_index, add_vectors, remove_vectors, dimension
+# extract_text / extract_non_pdf are re-exported for existing callers
+from app.document.extraction import (
+    extract_text,
+    extract_text_with_stats,
+    extract_non_pdf,
+)
 from app.database import SessionLocal
 from app.models.chunk import DocumentChunk
+from app.models.document import Document
+from app.models.extraction_stat import ExtractionStat
+from app.document.results_store import store_result_records, delete_result_records
 
 
 # =====================================================
-# CONFIGURE EXTERNAL TOOLS (UPDATE PATHS IF NEEDED)
+# EXTRACTION STATS
 # =====================================================
 
-POPPLER_PATH = r"C:\poppler-25.12.0\Library\bin"
-TESSERACT_PATH = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
-GHOSTSCRIPT_CMD = "gswin64c"  # make sure this works in CMD
-
-pytesseract.pytesseract.tesseract_cmd = TESSERACT_PATH
-
-
-# =====================================================
-# LOAD EMBEDDING MODEL
-# =====================================================
+def record_extraction_stats(db, document_id, stats):
 
-model = SentenceTransformer("all-MiniLM-L6-v2")
-
-
-# =====================================================
-# EXTRACT TEXT (PDF + OCR + Ghostscript)
-# =====================================================
-
-def extract_text(file_path, file_type):
-
-    if file_type != "pdf":
-        return extract_non_pdf(file_path, file_type)
-
-    text = ""
-
-    try:
-        # -------------------------------------------------
-        # 1️⃣ Try normal PDF text extraction
-        # -------------------------------------------------
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-
-        # -------------------------------------------------
-        # 2️⃣ Weak detection → OCR using Poppler + Tesseract
-        # -------------------------------------------------
-        if len(text.strip()) < 200:
-            print("⚠ Weak extraction detected → Running OCR")
-
-            images = convert_from_path(
-                file_path,
-                dpi=300,
-                poppler_path=POPPLER_PATH
-            )
-
-            ocr_text = ""
-            for img in images:
-                ocr_text += pytesseract.image_to_string(
-                    img,
-                    lang="eng"
-                )
-
-            text = ocr_text
-
-        # -------------------------------------------------
-        # 3️⃣ Still weak → Ghostscript rendering fallback
-        # -------------------------------------------------
-        if len(text.strip()) < 100:
-            print("⚠ OCR weak → Running Ghostscript fallback")
-
-            output_image = "temp_render.png"
-
-            gs_command = [
-                GHOSTSCRIPT_CMD,
-                "-dNOPAUSE",
-                "-dBATCH",
-                "-sDEVICE=png16m",
-                "-r300",
-                f"-sOutputFile={output_image}",
-                file_path
-            ]
-
-            subprocess.run(gs_command, check=True)
-
-            text = pytesseract.image_to_string(output_image)
-
-            if os.path.exists(output_image):
-                os.remove(output_image)
-
-        return text
-
-    except Exception as e:
-        print("PDF extraction error:", e)
-        return ""
-
-
-# =====================================================
-# NON-PDF EXTRACTION
-# =====================================================
-
-def extract_non_pdf(file_path, file_type):
-
-    if file_type == "docx":
-        doc = DocxDocument(file_path)
-        return "\n".join([para.text for para in doc.paragraphs])
-
-    elif file_type == "txt":
-        with open(file_path, "r", encoding="utf-8") as f:
-            return f.read()
-
-    elif file_type == "xml":
-        tree = ET.parse(file_path)
-        root = tree.getroot()
-        return ET.tostring(root, encoding="unicode")
-
-    return ""
+    db.add(ExtractionStat(
+        document_id=document_id,
+        pages_total=stats["pages_total"],
+        pages_text=stats["pages_text"],
+        pages_ocr=stats["pages_ocr"],
+        ocr_seconds=stats["ocr_seconds"],
+        used_ghostscript=stats["used_ghostscript"],
+        ghostscript_seconds=stats.get("ghostscript_seconds", 0.0),
+        cache_hit=stats["cache_hit"],
+    ))
+    db.commit()
 
 
 # =====================================================
@@ -150,65 +65,106 @@ def detect_document_type(text: str):
 # RESULT DOCUMENT CHUNKING
 # =====================================================
 
-def chunk_result_document(text):
+SEMESTER_RE = re.compile(r"Semester\s*[- ]?\s*(\w+)", re.IGNORECASE)
+RESULT_WORD_RE = re.compile(r"\bPass\b|\bFail\b", re.IGNORECASE)
+SGPI_RE = re.compile(r"\b\d+\.\d+\b")
+TOTAL_NUMBER_RE = re.compile(r"\b\d{2,4}\b")
+SUBJECT_CODE_RE = re.compile(r"([A-Z]{2,6}\d{3,4})")
+SUBJECT_MARKS_RE = re.compile(r"\b\d{2,3}\b")
+
+# How far above a student line to look for the total / subject lines
+TOTAL_LOOKBACK = 39
+SUBJECT_LOOKBACK = 29
 
-    lines = [line.strip() for line in text.split("\n") if line.strip()]
-    chunks = []
+
+def parse_result_records(text):
+    """
+    Single pass over a result ledger. Yields one dict per student line
+    (name, semester, result, total_marks, sgpi, subjects) using rolling
+    windows of the recent total-marks and subject lines.
+    """
 
     semester = "Unknown"
-    sem_match = re.search(r"Semester\s*[- ]?\s*(\w+)", text, re.IGNORECASE)
+    sem_match = SEMESTER_RE.search(text)
     if sem_match:
         semester = sem_match.group(1)
 
-    for i, line in enumerate(lines):
+    recent_totals = deque()    # (line_no, total or None)
+    recent_subjects = deque()  # (line_no, code, marks)
+
+    line_no = -1
 
-        if "--" in line or re.search(r"\bPass\b|\bFail\b", line, re.IGNORECASE):
+    for raw_line in text.split("\n"):
+        line = raw_line.strip()
+        if not line:
+            continue
 
-            name = line.split("--")[0].strip()
+        line_no += 1
 
-            result = "Pass"
-            if "FAIL" in line.upper():
-                result = "Fail"
+        while recent_totals and recent_totals[0][0] < line_no - TOTAL_LOOKBACK:
+            recent_totals.popleft()
+        while recent_subjects and recent_subjects[0][0] < line_no - SUBJECT_LOOKBACK:
+            recent_subjects.popleft()
 
-            total_marks = "Unknown"
-            sgpi = "Unknown"
+        if "--" in line or RESULT_WORD_RE.search(line):
+
+            sgpi_match = SGPI_RE.search(line)
+
+            # Nearest total line wins; farther subject lines override values
             subjects = {}
+            for _, code, marks in reversed(recent_subjects):
+                subjects[code] = marks
+
+            yield {
+                "name": line.split("--")[0].strip(),
+                "semester": semester,
+                "result": "Fail" if "FAIL" in line.upper() else "Pass",
+                "total_marks": (
+                    recent_totals[-1][1]
+                    if recent_totals and recent_totals[-1][1] is not None
+                    else "Unknown"
+                ),
+                "sgpi": sgpi_match.group(0) if sgpi_match else "Unknown",
+                "subjects": subjects,
+            }
+
+        # The very first line is never part of a lookback window
+        if line_no == 0:
+            continue
+
+        if "MarksO" in line or "TOTAL" in line.upper():
+            numbers = TOTAL_NUMBER_RE.findall(line)
+            recent_totals.append((line_no, numbers[-1] if numbers else None))
 
-            sgpi_match = re.search(r"\b\d+\.\d+\b", line)
-            if sgpi_match:
-                sgpi = sgpi_match.group(0)
-
-            for j in range(i - 1, max(i - 40, 0), -1):
-                if "MarksO" in lines[j] or "TOTAL" in lines[j].upper():
-                    numbers = re.findall(r"\b\d{2,4}\b", lines[j])
-                    if numbers:
-                        total_marks = numbers[-1]
-                    break
-
-            for j in range(i - 1, max(i - 30, 0), -1):
-                subject_match = re.match(r"([A-Z]{2,6}\d{3,4})", lines[j])
-                if subject_match:
-                    subject_code = subject_match.group(1)
-                    numbers = re.findall(r"\b\d{2,3}\b", lines[j])
-                    if numbers:
-                        subjects[subject_code] = numbers[-1]
-
-            chunk = f"""
-Student Name: {name}
-Semester: {semester}
-Overall Result: {result}
-Total Marks Obtained: {total_marks}
-SGPI: {sgpi}
+        subject_match = SUBJECT_CODE_RE.match(line)
+        if subject_match:
+            numbers = SUBJECT_MARKS_RE.findall(line)
+            if numbers:
+                recent_subjects.append(
+                    (line_no, subject_match.group(1), numbers[-1])
+                )
+
+
+def format_result_chunk(record):
+
+    chunk = f"""
+Student Name: {record["name"]}
+Semester: {record["semester"]}
+Overall Result: {record["result"]}
+Total Marks Obtained: {record["total_marks"]}
+SGPI: {record["sgpi"]}
 
 Subject Performance:
 """
 
-            for code, marks in subjects.items():
-                chunk += f"- {code}: {marks} marks\n"
+    for code, marks in record["subjects"].items():
+        chunk += f"- {code}: {marks} marks\n"
 
-            chunks.append(chunk.strip())
+    return chunk.strip()
 
-    return chunks
+
+def chunk_result_document(text):
+    return [format_result_chunk(record) for record in parse_result_records(text)]
 
 
 # =====================================================
@@ -275,12 +231,23 @@ def chunk_general_document(text):
 # =====================================================
 
 def chunk_text(text):
+    return chunk_text_with_records(text)[0]
+
+
+def chunk_text_with_records(text):
+    """
+    Like chunk_text(), but also returns the parsed result records for
+    RESULT documents (one record per chunk, same order), else None.
+    """
 
     doc_type = detect_document_type(text)
     print("Detected document type:", doc_type)
 
+    records = None
+
     if doc_type == "RESULT":
-        chunks = chunk_result_document(text)
+        records = list(parse_result_records(text))
+        chunks = [format_result_chunk(record) for record in records]
     elif doc_type == "SYLLABUS":
         chunks = chunk_syllabus_document(text)
     elif doc_type == "EVENT":
@@ -289,30 +256,119 @@ def chunk_text(text):
         chunks = chunk_general_document(text)
 
     print("Chunks created:", len(chunks))
-    return chunks
+    return chunks, records
+
+
+# =====================================================
+# STORE CHUNKS (BATCHED)
+# =====================================================
+
+def bulk_insert_chunks(db, document_id, indexed_chunks):
+    """
+    Insert [(chunk_index, chunk_text), ...] (unique indexes) for one
+    document with batched multi-row INSERT ... RETURNING, then set
+    vector_id = id with a single UPDATE. Returns the new chunk IDs in
+    input order. Caller commits.
+    """
+
+    if not indexed_chunks:
+        return []
+
+    result = db.execute(
+        insert(DocumentChunk).returning(
+            DocumentChunk.id,
+            DocumentChunk.chunk_index
+        ),
+        [
+            {
+                "document_id": document_id,
+                "chunk_index": chunk_index,
+                "chunk_text": chunk_value,
+            }
+            for chunk_index, chunk_value in indexed_chunks
+        ]
+    )
+
+    # RETURNING order is not guaranteed, so map back through chunk_index
+    id_by_index = {row.chunk_index: row.id for row in result}
+    chunk_ids = [id_by_index[chunk_index] for chunk_index, _ in indexed_chunks]
+
+    # FAISS IDs are chunk IDs
+    db.execute(
+        update(DocumentChunk)
+        .where(
+            DocumentChunk.document_id == document_id,
+            DocumentChunk.vector_id.is_(None)
+        )
+        .values(vector_id=DocumentChunk.id)
+    )
+
+    return chunk_ids
 
 
 # =====================================================
 # CREATE EMBEDDINGS
 # =====================================================
 
-def create_embeddings(text_chunks):
+def create_embeddings(text_chunks, stats=None):
+    """
+    Embed chunks, sending only chunks whose text has not been embedded
+    by the current model before to the model. Pass a dict as `stats`
+    to receive the cache hit/miss counts for this ingestion.
+    """
+
+    text_hashes = [chunk_text_hash(chunk) for chunk in text_chunks]
+    vectors = load_embeddings(text_hashes, EMBEDDING_MODEL_NAME)
+
+    missing = {}
+    for text_hash, chunk in zip(text_hashes, text_chunks):
+        if text_hash not in vectors:
+            missing[text_hash] = chunk
+
+    if missing:
+        fresh = get_model().encode(
+            list(missing.values()),
+            normalize_embeddings=True,
+            batch_size=16,
+            show_progress_bar=False
+        )
+        fresh = np.array(fresh).astype("float32")
+
+        fresh_by_hash = dict(zip(missing.keys(), fresh))
+        store_embeddings(fresh_by_hash, EMBEDDING_MODEL_NAME)
+        vectors.update(fresh_by_hash)
 
-    embeddings = model.encode(
-        text_chunks,
-        normalize_embeddings=True,
-        batch_size=16,
-        show_progress_bar=False
+    hits = len(text_chunks) - sum(
+        1 for text_hash in text_hashes if text_hash in missing
     )
 
-    return np.array(embeddings).astype("float32")
+    embed_stats = {
+        "chunks": len(text_chunks),
+        "cache_hits": hits,
+        "cache_misses": len(text_chunks) - hits,
+        "encoded": len(missing),
+        "hit_ratio": round(hits / len(text_chunks), 4) if text_chunks else None,
+    }
+
+    print(
+        f"🧠 Embedding cache: {hits}/{len(text_chunks)} hits, "
+        f"{len(missing)} chunks encoded"
+    )
+
+    if stats is not None:
+        stats.update(embed_stats)
+
+    if not text_chunks:
+        return np.zeros((0, dimension), dtype="float32")
+
+    return np.vstack([vectors[text_hash] for text_hash in text_hashes]).astype("float32")
 
 
 # =====================================================
 # SAVE TO FAISS
 # =====================================================
 
-def save_to_faiss(embeddings, ids):
+def save_to_faiss(embeddings, ids, persist=True):
 
     index = get_index()
     ids = np.array(ids)
@@ -323,20 +379,38 @@ def save_to_faiss(embeddings, ids):
             f"does not match FAISS dimension {index.d}"
         )
 
-    index.add_with_ids(embeddings, ids)
-    save_index()
+    # Logged to the vector WAL; full snapshots are written periodically
+    add_vectors(embeddings, ids)
+
+    # Bulk ingestion adds many batches and checks for a snapshot once at the end
+    if persist:
+        save_index()
 
 
 # =====================================================
 # FULL PROCESS PIPELINE
 # =====================================================
 
-def process_document(file_path, file_type, document_id):
+def process_document(file_path, file_type, document_id, on_stage=None):
+    """
+    Extract → chunk → store → embed → index a document.
+    `on_stage(name)` is called as each stage starts (used by the job queue).
+    """
+
+    report_stage = on_stage or (lambda stage: None)
 
     db = SessionLocal()
 
     try:
-        text = extract_text(file_path, file_type)
+        report_stage("extracting")
+
+        document = db.query(Document).filter(Document.id == document_id).first()
+        file_hash = document.file_hash if document else None
+
+        text, extraction_stats = extract_text_with_stats(
+            file_path, file_type, file_hash
+        )
+        record_extraction_stats(db, document_id, extraction_stats)
 
         if not text or len(text.strip()) < 50:
             return {
@@ -344,7 +418,9 @@ def process_document(file_path, file_type, document_id):
                 "message": "Insufficient text extracted"
             }
 
-        chunks = chunk_text(text)
+        report_stage("chunking")
+
+        chunks, result_records = chunk_text_with_records(text)
 
         if not chunks:
             return {
@@ -352,30 +428,181 @@ def process_document(file_path, file_type, document_id):
                 "message": "No chunks created"
             }
 
-        chunk_ids = []
-        chunk_values = []
+        report_stage("storing")
+
+        chunk_values = list(chunks)
+        chunk_ids = bulk_insert_chunks(db, document_id, list(enumerate(chunk_values)))
+
+        # Structured rows for aggregate result queries
+        store_result_records(db, document_id, result_records, chunk_ids)
+
+        db.commit()
+
+        report_stage("embedding")
+
+        embedding_stats = {}
+        embeddings = create_embeddings(chunk_values, embedding_stats)
+
+        report_stage("indexing")
+
+        save_to_faiss(embeddings, chunk_ids)
+
+        return {
+            "status": "success",
+            "chunks_processed": len(chunks),
+            "extraction": extraction_stats,
+            "embedding_cache": embedding_stats
+        }
+
+    except Exception as e:
+        db.rollback()
+        return {
+            "status": "error",
+            "message": str(e)
+        }
+
+    finally:
+        db.close()
+
+
+# =====================================================
+# INCREMENTAL RE-INGESTION (CHANGED FILE)
+# =====================================================
+
+def diff_chunks(existing_chunks, new_chunks):
+    """
+    Match new chunk texts against stored DocumentChunk rows.
+    Returns (kept, added, removed):
+      kept    -> [(row, new_index)]
+      added   -> [(new_index, text)]
+      removed -> [row]
+    """
+
+    pool = {}
+    for row in existing_chunks:
+        pool.setdefault(row.chunk_text, []).append(row)
+
+    kept = []
+    added = []
+
+    for i, chunk_value in enumerate(new_chunks):
+        rows = pool.get(chunk_value)
+        if rows:
+            kept.append((rows.pop(0), i))
+        else:
+            added.append((i, chunk_value))
+
+    removed = [row for rows in pool.values() for row in rows]
+
+    return kept, added, removed
+
 
-        for i, chunk_value in enumerate(chunks):
-            db_chunk = DocumentChunk(
-                document_id=document_id,
-                chunk_text=chunk_value,
-                chunk_index=i
+def reprocess_document(file_path, file_type, document_id, on_stage=None):
+    """
+    Re-ingest an updated file: only vectors for chunks that changed are
+    removed from / added to FAISS; unchanged chunks keep their IDs.
+    """
+
+    report_stage = on_stage or (lambda stage: None)
+
+    db = SessionLocal()
+
+    try:
+        report_stage("extracting")
+
+        document = db.query(Document).filter(Document.id == document_id).first()
+        file_hash = document.file_hash if document else None
+
+        text, extraction_stats = extract_text_with_stats(
+            file_path, file_type, file_hash
+        )
+        record_extraction_stats(db, document_id, extraction_stats)
+
+        if not text or len(text.strip()) < 50:
+            return {
+                "status": "error",
+                "message": "Insufficient text extracted"
+            }
+
+        report_stage("chunking")
+
+        chunks, result_records = chunk_text_with_records(text)
+
+        if not chunks:
+            return {
+                "status": "error",
+                "message": "No chunks created"
+            }
+
+        existing_chunks = db.query(DocumentChunk).filter(
+            DocumentChunk.document_id == document_id
+        ).order_by(DocumentChunk.chunk_index).all()
+
+        kept, added, removed = diff_chunks(existing_chunks, chunks)
+
+        # Embed before touching the DB so a model failure changes nothing
+        report_stage("embedding")
+
+        embedding_stats = {}
+        embeddings = create_embeddings(
+            [chunk_value for _, chunk_value in added],
+            embedding_stats
+        )
+
+        report_stage("storing")
+
+        removed_ids = [row.id for row in removed]
+
+        if removed_ids:
+            db.execute(
+                delete(DocumentChunk).where(DocumentChunk.id.in_(removed_ids))
             )
 
-            db.add(db_chunk)
-            db.flush()
+        reindexed = [
+            {"id": row.id, "chunk_index": new_index}
+            for row, new_index in kept
+            if row.chunk_index != new_index
+        ]
+        if reindexed:
+            db.execute(update(DocumentChunk), reindexed)
+
+        added_ids = bulk_insert_chunks(db, document_id, added)
+
+        # Result rows are cheap to rebuild: replace them wholesale
+        delete_result_records(db, document_id)
 
-            chunk_ids.append(db_chunk.id)
-            chunk_values.append(chunk_value)
+        if result_records:
+            chunk_ids = [None] * len(chunks)
+            for row, new_index in kept:
+                chunk_ids[new_index] = row.id
+            for (new_index, _), chunk_id in zip(added, added_ids):
+                chunk_ids[new_index] = chunk_id
+
+            store_result_records(db, document_id, result_records, chunk_ids)
 
         db.commit()
 
-        embeddings = create_embeddings(chunk_values)
-        save_to_faiss(embeddings, chunk_ids)
+        report_stage("indexing")
+
+        remove_vectors(removed_ids)
+
+        if added_ids:
+            save_to_faiss(embeddings, added_ids)
+        else:
+            save_index()
+
+        print(
+            f"♻ Re-ingested document {document_id}: "
+            f"{len(added)} added, {len(removed)} removed, {len(kept)} kept"
+        )
 
         return {
             "status": "success",
-            "chunks_processed": len(chunks)
+            "chunks_added": len(added),
+            "chunks_removed": len(removed),
+            "chunks_kept": len(kept),
+            "extraction": extraction_stats,
+            "embedding_cache": embedding_stats
         }
 
     except Exception as e:
@@ -386,4 +613,4 @@ def process_document(file_path, file_type, document_id):
         }
 
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -0,0 +1,81 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "2048"))
+
+
+def normalize_question(text: str):
+    # Spacing never changes the vector; case can (EMBEDDING_MODEL_NAME may
+    # be a cased model), so it is kept — the key is exactly what gets embedded
+    return " ".join(text.split())
+
+
+# =====================================================
+# LRU CACHE: NORMALIZED QUESTION -> FLOAT32 VECTOR
+# =====================================================
+
+class QueryEmbeddingCache:
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+
+        with self._lock:
+            vector = self._entries.get(key)
+
+            if vector is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, key, vector):
+
+        if self.max_size <= 0:
+            return
+
+        vector = np.array(vector, dtype="float32")
+        vector.setflags(write=False)
+
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self):
+
+        with self._lock:
+            lookups = self.hits + self.misses
+
+            return {
+                "max_size": self.max_size,
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+query_cache = QueryEmbeddingCache(QUERY_EMBEDDING_CACHE_SIZE)
@@ -0,0 +1,135 @@
+import os
+import queue
+import threading
+
+import numpy as np
+
+
+# Keep the embeddings of retrieval questions (not their text) so index
+# settings can be evaluated on real traffic: `ann_index encodings`.
+# Off by default; turn it on for a while before running the report
+FAISS_QUERY_LOG = os.getenv("FAISS_QUERY_LOG", "0") == "1"
+FAISS_QUERY_LOG_MAX = int(os.getenv("FAISS_QUERY_LOG_MAX", "10000"))
+
+# Questions waiting for the writer thread; more are dropped, not waited on
+QUERY_LOG_QUEUE_SIZE = 1024
+
+
+# =====================================================
+# QUERY EMBEDDING LOG
+# =====================================================
+
+class QueryLog:
+    """
+    Appends float32 query vectors as fixed-size rows. Once the file holds
+    `max_queries` rows it becomes `path.old` (replacing the previous one),
+    so at most 2 × max_queries are kept. Shared by every worker: each
+    batch of rows is a single O_APPEND write. append() only queues the
+    vector — a background thread does the disk I/O, off the chat path.
+    """
+
+    def __init__(self, path, dimension, max_queries=FAISS_QUERY_LOG_MAX, enabled=FAISS_QUERY_LOG):
+        self.path = path
+        self.dimension = dimension
+        self.max_bytes = max_queries * dimension * 4
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._fd = None
+
+        self._queue = queue.Queue(maxsize=QUERY_LOG_QUEUE_SIZE)
+        self._thread = None
+        self.dropped = 0
+
+    def _open(self):
+
+        if self._fd is not None:
+            try:
+                replaced = os.stat(self.path).st_ino != os.fstat(self._fd).st_ino
+            except FileNotFoundError:
+                replaced = True
+
+            if not replaced:
+                return self._fd
+
+            os.close(self._fd)
+
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        return self._fd
+
+    def append(self, vectors):
+
+        if not self.enabled:
+            return
+
+        vectors = np.array(vectors, dtype="float32").reshape(-1, self.dimension)
+
+        self._ensure_started()
+
+        try:
+            self._queue.put_nowait(vectors)
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_started(self):
+
+        if self._thread is not None:
+            return
+
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="query-log",
+                    daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+
+        while True:
+            batch = [self._queue.get()]
+
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            self._write(np.concatenate(batch))
+
+    def _write(self, vectors):
+
+        try:
+            fd = self._open()
+            os.write(fd, vectors.tobytes())
+
+            if os.fstat(fd).st_size >= self.max_bytes:
+                os.replace(self.path, self.path + ".old")
+        except OSError as e:
+            # Never fail a question because of the log
+            print("[FAISS] Query log write failed:", e)
+
+    def load(self, limit=None):
+        """Logged query vectors, oldest first (the most recent `limit`)."""
+
+        row_bytes = self.dimension * 4
+        parts = []
+
+        for path in (self.path + ".old", self.path):
+            if not os.path.exists(path):
+                continue
+
+            with open(path, "rb") as f:
+                data = f.read()
+
+            # A concurrent append may have left a partial row
+            data = data[:len(data) - len(data) % row_bytes]
+            parts.append(np.frombuffer(data, dtype="float32").reshape(-1, self.dimension))
+
+        if not parts:
+            return np.empty((0, self.dimension), dtype="float32")
+
+        queries = np.concatenate(parts)
+
+        return queries[-limit:] if limit else queries
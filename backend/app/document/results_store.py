@@ -0,0 +1,103 @@
+from sqlalchemy import insert, delete
+
+from app.models.student_result import StudentResult, SubjectMark
+
+
+ROMAN_SEMESTERS = {
+    "I": 1, "II": 2, "III": 3, "IV": 4, "V": 5,
+    "VI": 6, "VII": 7, "VIII": 8, "IX": 9, "X": 10,
+}
+
+
+def normalize_name(name: str):
+    return " ".join(name.lower().split())
+
+
+def parse_semester(label):
+
+    label = (label or "").strip().upper()
+
+    if label.isdigit():
+        return int(label)
+
+    return ROMAN_SEMESTERS.get(label)
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# =====================================================
+# STORE PARSED RESULT RECORDS (AT INGESTION)
+# =====================================================
+
+def store_result_records(db, document_id, records, chunk_ids=None):
+    """
+    Persist records from parse_result_records(). chunk_ids, when given,
+    lines up 1:1 with records (each record is one chunk). Caller commits.
+    """
+
+    if not records:
+        return 0
+
+    rows = []
+    for i, record in enumerate(records):
+        rows.append({
+            "document_id": document_id,
+            "chunk_id": chunk_ids[i] if chunk_ids else None,
+            "name": record["name"],
+            "name_normalized": normalize_name(record["name"]),
+            "semester_label": record["semester"],
+            "semester": parse_semester(record["semester"]),
+            "sgpi": _to_float(record["sgpi"]),
+            "total_marks": _to_int(record["total_marks"]),
+            "result": record["result"],
+        })
+
+    result = db.execute(
+        insert(StudentResult).returning(
+            StudentResult.id,
+            StudentResult.chunk_id,
+            StudentResult.name_normalized
+        ),
+        rows
+    )
+
+    # Map returned IDs back to their records (RETURNING order is not guaranteed)
+    ids_by_key = {}
+    for row in result:
+        ids_by_key.setdefault((row.chunk_id, row.name_normalized), []).append(row.id)
+
+    mark_rows = []
+    for row, record in zip(rows, records):
+        result_id = ids_by_key[(row["chunk_id"], row["name_normalized"])].pop()
+
+        for code, marks in record["subjects"].items():
+            mark_rows.append({
+                "student_result_id": result_id,
+                "document_id": document_id,
+                "semester": row["semester"],
+                "subject_code": code,
+                "marks": _to_int(marks),
+            })
+
+    if mark_rows:
+        db.execute(insert(SubjectMark), mark_rows)
+
+    return len(rows)
+
+
+def delete_result_records(db, document_id):
+
+    db.execute(delete(SubjectMark).where(SubjectMark.document_id == document_id))
+    db.execute(delete(StudentResult).where(StudentResult.document_id == document_id))
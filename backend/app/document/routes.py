@@ -1,22 +1,35 @@
 import os
-import hashlib
+import zipfile
+from typing import List
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.database import SessionLocal
 from app.models.document import Document
-from app.models.chunk import DocumentChunk
+from app.models.ingestion_job import IngestionJob
 from app.auth.dependencies import admin_required
-from app.document.processing import (
-    extract_text,
-    chunk_text,
-    create_embeddings,
-    save_to_faiss,
+from app.services.ingestion_queue import (
+    enqueue_ingestion,
+    enqueue_bulk_ingestion,
+    job_to_dict,
 )
+from app.document.bulk import SUPPORTED_FILE_TYPES
+from app.utils.files import stream_to_temp_file, iter_file_blocks, FileTooLargeError
 
 UPLOAD_DIR = "data"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+MAX_UPLOAD_SIZE_MB = int(os.getenv("MAX_UPLOAD_SIZE_MB", "50"))
+MAX_UPLOAD_SIZE_BYTES = MAX_UPLOAD_SIZE_MB * 1024 * 1024
+
+# Whole request bodies (file(s) + multipart framing), enforced while they
+# arrive by RequestSizeLimitMiddleware (see app.main)
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+MAX_UPLOAD_REQUEST_BYTES = MAX_UPLOAD_SIZE_BYTES + MULTIPART_OVERHEAD_BYTES
+
+MAX_BULK_UPLOAD_SIZE_MB = int(os.getenv("MAX_BULK_UPLOAD_SIZE_MB", "1024"))
+MAX_BULK_UPLOAD_REQUEST_BYTES = MAX_BULK_UPLOAD_SIZE_MB * 1024 * 1024 + MULTIPART_OVERHEAD_BYTES
+
 router = APIRouter()
 
 
@@ -28,91 +41,166 @@ def get_db():
         db.close()
 
 
-def generate_file_hash(file_bytes: bytes):
-    return hashlib.sha256(file_bytes).hexdigest()
-
+def store_document(db, filename, fileobj, department, semester, subject, user_id):
+    """
+    Stream the file to disk and create its Document row.
+    Returns None for duplicates; raises FileTooLargeError past the limit.
+    """
 
-@router.post("/upload")
-def upload_document(
-    department: str = None,
-    semester: int = None,
-    subject: str = None,
-    file: UploadFile = File(...),
-    user=Depends(admin_required),
-    db: Session = Depends(get_db),
-):
-
-    # Read file
-    file_bytes = file.file.read()
-    file_hash = generate_file_hash(file_bytes)
+    # Stream in fixed-size blocks, hashing on the fly (bounded memory)
+    temp_path, file_hash, _ = stream_to_temp_file(
+        iter_file_blocks(fileobj),
+        UPLOAD_DIR,
+        MAX_UPLOAD_SIZE_BYTES
+    )
 
     # Duplicate check
     existing = db.query(Document).filter(Document.file_hash == file_hash).first()
     if existing:
-        raise HTTPException(status_code=400, detail="File already exists")
+        os.remove(temp_path)
+        return None
 
-    # Save file
-    file_path = os.path.join(UPLOAD_DIR, file.filename)
-    with open(file_path, "wb") as f:
-        f.write(file_bytes)
+    # Move into place atomically. Same-named files (e.g. sem1/result.pdf and
+    # sem2/result.pdf in one zip) must not overwrite each other, so the path
+    # is keyed by content; the original name is kept in Document.filename
+    file_path = os.path.join(UPLOAD_DIR, f"{file_hash[:16]}_{filename}")
+    os.replace(temp_path, file_path)
 
-    file_type = file.filename.split(".")[-1].lower()
+    file_type = filename.split(".")[-1].lower()
 
     # Save document metadata (with defaults)
     new_doc = Document(
-        filename=file.filename,
+        filename=filename,
         file_path=file_path,
         file_type=file_type,
         file_hash=file_hash,
         department=department or "GENERAL",
         semester=semester or 0,
         subject=subject or "GENERAL",
-        uploaded_by=user.id,
+        uploaded_by=user_id,
     )
 
     db.add(new_doc)
     db.commit()
     db.refresh(new_doc)
 
-    # Extract text
-    text = extract_text(file_path, file_type)
+    return new_doc
 
-    if not text or not text.strip():
-        raise HTTPException(status_code=400, detail="Could not extract text")
 
-    # Chunk text
-    chunks = chunk_text(text)
+@router.post("/upload")
+def upload_document(
+    department: str = None,
+    semester: int = None,
+    subject: str = None,
+    file: UploadFile = File(...),
+    user=Depends(admin_required),
+    db: Session = Depends(get_db),
+):
 
-    # Generate embeddings
-    embeddings = create_embeddings(chunks)
+    try:
+        new_doc = store_document(
+            db,
+            file.filename,
+            file.file,
+            department,
+            semester,
+            subject,
+            user.id,
+        )
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
 
-    # Store chunks first (to get DB IDs)
-    chunk_ids = []
+    if new_doc is None:
+        raise HTTPException(status_code=400, detail="File already exists")
 
-    for i, chunk_text_value in enumerate(chunks):
-        db_chunk = DocumentChunk(
-            document_id=new_doc.id,
-            chunk_text=chunk_text_value,
-            chunk_index=i,
-        )
-        db.add(db_chunk)
-        db.flush()  # gets ID immediately
-        chunk_ids.append(db_chunk.id)
+    # Extraction, OCR, chunking and embedding run in the background
+    job = enqueue_ingestion(db, new_doc.id)
 
-    db.commit()
+    return {
+        "message": "File uploaded, ingestion queued",
+        "document_id": new_doc.id,
+        "job_id": job.id,
+    }
 
-    # Save embeddings with explicit IDs
-    save_to_faiss(embeddings, chunk_ids)
 
-    # Update vector_id field
-    for cid in chunk_ids:
-        chunk = db.query(DocumentChunk).get(cid)
-        chunk.vector_id = cid
+@router.post("/upload-bulk")
+def upload_documents_bulk(
+    department: str = None,
+    semester: int = None,
+    subject: str = None,
+    files: List[UploadFile] = File(...),
+    user=Depends(admin_required),
+    db: Session = Depends(get_db),
+):
+    """
+    Accepts many files and/or .zip archives and ingests them as one
+    pipelined background job (GET /document/jobs/{id} for progress).
+    """
+
+    document_ids = []
+    skipped = []
+
+    def add_file(filename, fileobj):
+        filename = os.path.basename(filename)
+        file_type = filename.split(".")[-1].lower()
+
+        if file_type not in SUPPORTED_FILE_TYPES:
+            skipped.append({"filename": filename, "reason": "Unsupported type"})
+            return
+
+        try:
+            new_doc = store_document(
+                db, filename, fileobj, department, semester, subject, user.id
+            )
+        except FileTooLargeError as e:
+            skipped.append({"filename": filename, "reason": str(e)})
+            return
+
+        if new_doc is None:
+            skipped.append({"filename": filename, "reason": "File already exists"})
+            return
+
+        document_ids.append(new_doc.id)
+
+    for upload in files:
+        if upload.filename.lower().endswith(".zip"):
+            try:
+                with zipfile.ZipFile(upload.file) as archive:
+                    for member in archive.infolist():
+                        if member.is_dir():
+                            continue
+                        with archive.open(member) as member_file:
+                            add_file(member.filename, member_file)
+            except zipfile.BadZipFile:
+                skipped.append({"filename": upload.filename, "reason": "Invalid zip"})
+        else:
+            add_file(upload.filename, upload.file)
+
+    if not document_ids:
+        raise HTTPException(
+            status_code=400,
+            detail={"message": "No new documents to ingest", "skipped": skipped}
+        )
 
-    db.commit()
+    job = enqueue_bulk_ingestion(db, document_ids)
 
     return {
-        "message": "File uploaded and indexed successfully",
-        "document_id": new_doc.id,
-        "chunks_created": len(chunks),
+        "message": f"{len(document_ids)} files uploaded, bulk ingestion queued",
+        "document_ids": document_ids,
+        "skipped": skipped,
+        "job_id": job.id,
     }
+
+
+@router.get("/jobs/{job_id}")
+def get_ingestion_job(
+    job_id: int,
+    user=Depends(admin_required),
+    db: Session = Depends(get_db),
+):
+    job = db.query(IngestionJob).filter(IngestionJob.id == job_id).first()
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return job_to_dict(job)
@@ -3,14 +3,11 @@ import time
 import numpy as np
 from sqlalchemy.orm import Session
 
-from app.document.faiss_manager import get_index
+from app.document.embedder import embed_query
+from app.document.faiss_manager import search_index, query_log
 from app.models.chunk import DocumentChunk
 from app.models.document import Document
 from app.database import SessionLocal
-from sentence_transformers import SentenceTransformer
-
-
-model = SentenceTransformer("all-MiniLM-L6-v2")
 
 
 def search_similar_chunks(question: str, top_k: int = 8):
@@ -19,8 +16,6 @@ def search_similar_chunks(question: str, top_k: int = 8):
     start_time = time.time()
 
     try:
-        index = get_index()
-
         print("\n" + "=" * 70)
         print("🔎 SEARCH DEBUG START")
         print("Question:", question)
@@ -47,7 +42,8 @@ def search_similar_chunks(question: str, top_k: int = 8):
         # --------------------------------------------------
         # 3️⃣ Build DB filter query
         # --------------------------------------------------
-        query = db.query(DocumentChunk)
+        # IDs only — the chunk text is not needed to filter
+        query = db.query(DocumentChunk.id)
 
         if semester_filter:
             query = query.join(Document).filter(
@@ -59,10 +55,12 @@ def search_similar_chunks(question: str, top_k: int = 8):
                 DocumentChunk.chunk_text.contains(subject_filter)
             )
 
-        filtered_chunks = query.all()
+        allowed_ids = None
+
+        if semester_filter or subject_filter:
+            allowed_ids = {chunk_id for (chunk_id,) in query.all()}
 
-        if filtered_chunks:
-            allowed_ids = {chunk.id for chunk in filtered_chunks}
+        if allowed_ids:
             print("✅ Filtered ID Count:", len(allowed_ids))
         else:
             allowed_ids = None
@@ -71,16 +69,21 @@ def search_similar_chunks(question: str, top_k: int = 8):
         # --------------------------------------------------
         # 4️⃣ Embed question
         # --------------------------------------------------
-        question_embedding = model.encode(
-            [question],
-            normalize_embeddings=True
-        ).astype("float32")
+        question_embedding = embed_query(question)
+        query_log.append(question_embedding)
 
         # --------------------------------------------------
         # 5️⃣ FAISS Search
         # --------------------------------------------------
-        search_k = top_k * 10  # search deeper
-        distances, indices = index.search(question_embedding, search_k)
+        # The filter is pushed into FAISS: these are the nearest allowed
+        # chunks. With FAISS_PARTITIONS only that semester's partitions
+        # are searched.
+        distances, indices = search_index(
+            question_embedding,
+            top_k,
+            semester=semester_filter if allowed_ids is not None else None,
+            allowed_ids=allowed_ids
+        )
 
         print("\n📊 Raw FAISS Results")
         print("IDs:", indices[0])
@@ -88,30 +91,22 @@ def search_similar_chunks(question: str, top_k: int = 8):
 
         result_ids = []
 
-        print("\n🔍 Filtering Logic:")
-
         for dist, idx in zip(distances[0], indices[0]):
 
             if idx == -1:
                 continue
 
-            # If DB filter exists, enforce it
-            if allowed_ids is not None and idx not in allowed_ids:
-                continue
-
             print(f"✅ Accepted ID {idx} (distance {dist:.4f})")
             result_ids.append(int(idx))
 
-            if len(result_ids) >= top_k:
-                break
-
         # --------------------------------------------------
         # 6️⃣ Fallback: If nothing matched DB filter
         # --------------------------------------------------
-        if not result_ids:
-            print("⚠ No matches after filtering — returning top_k raw FAISS")
+        if not result_ids and allowed_ids is not None:
+            print("⚠ No indexed vectors for the filter — returning top_k raw FAISS")
+            _, indices = search_index(question_embedding, top_k)
             result_ids = [
-                int(i) for i in indices[0][:top_k] if i != -1
+                int(i) for i in indices[0] if i != -1
             ]
 
         # --------------------------------------------------
@@ -0,0 +1,111 @@
+import numpy as np
+
+from app.document.ann_index import (
+    id_selector,
+    rebuild_without,
+    search_allowed,
+    search_parameters,
+    stored_ids,
+)
+
+
+# =====================================================
+# TOMBSTONED INDEX (NO IN-PLACE DELETE)
+# =====================================================
+
+class TombstonedIndex:
+    """
+    Wraps an index that cannot delete in place (HNSW graphs): removed IDs
+    become tombstones that searches skip with an IDSelector, so they never
+    take result slots. The vectors stay in memory until compacted() builds
+    a clean index. Exposes the same parts of the faiss Index API as
+    MappedIndex (d, ntotal, search, add_with_ids, remove_ids).
+    """
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.d = inner.d
+
+        self.dead = set()
+
+        self._ids = set(stored_ids(inner).tolist())
+        self._params = None
+
+    @property
+    def ntotal(self):
+        return self.inner.ntotal - len(self.dead)
+
+    def _refresh_filter(self):
+        self._params = (
+            search_parameters(self.inner, id_selector(self.dead, exclude=True))
+            if self.dead else None
+        )
+
+    # -------------------------------------------------
+    # Writes
+    # -------------------------------------------------
+
+    def add_with_ids(self, vectors, ids):
+
+        ids = np.asarray(ids, dtype="int64")
+
+        # A reused ID must not keep its old vector under the tombstone
+        reused = [int(i) for i in ids if int(i) in self.dead]
+        if reused:
+            self.inner, _ = rebuild_without(self.inner, reused)
+            self.dead.difference_update(reused)
+            self._ids.difference_update(reused)
+            self._refresh_filter()
+
+        self.inner.add_with_ids(vectors, ids)
+        self._ids.update(ids.tolist())
+
+    def remove_ids(self, ids):
+
+        newly_dead = [
+            i for i in (int(i) for i in np.asarray(ids).ravel())
+            if i in self._ids and i not in self.dead
+        ]
+
+        if newly_dead:
+            self.dead.update(newly_dead)
+            self._refresh_filter()
+
+        return len(newly_dead)
+
+    def stored_ids(self):
+
+        ids = stored_ids(self.inner)
+
+        if self.dead:
+            ids = ids[~np.isin(ids, list(self.dead))]
+
+        return ids
+
+    # -------------------------------------------------
+    # Search
+    # -------------------------------------------------
+
+    def search(self, queries, k, allowed_ids=None):
+        """allowed_ids: only these IDs may be returned (filter pushdown)."""
+
+        if allowed_ids is not None:
+            return search_allowed(self.inner, queries, k, set(allowed_ids) - self.dead)
+
+        if self._params is None:
+            return self.inner.search(queries, k)
+
+        return self.inner.search(queries, k, params=self._params)
+
+    # -------------------------------------------------
+    # Compaction
+    # -------------------------------------------------
+
+    def compacted(self):
+        """A new plain index without the tombstoned vectors."""
+
+        if not self.dead:
+            return self.inner
+
+        index, _ = rebuild_without(self.inner, sorted(self.dead))
+        return index
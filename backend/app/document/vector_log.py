@@ -0,0 +1,252 @@
+import os
+import glob
+import struct
+import zlib
+import threading
+
+import numpy as np
+
+
+# fsync every append: an acknowledged upload survives a power cut
+VECTOR_WAL_FSYNC = os.getenv("VECTOR_WAL_FSYNC", "1") == "1"
+
+OP_ADD = b"A"
+OP_DELETE = b"D"
+
+# op, count, dimension, crc32 of the payload
+RECORD_HEADER = struct.Struct("<cIII")
+
+
+# =====================================================
+# APPEND-ONLY VECTOR LOG
+# =====================================================
+
+class VectorLog:
+    """
+    Append-only log of index mutations (adds with their vectors, deletes)
+    since the last snapshot. `path` is the active segment; rotate() seals
+    it as `path.<seq>` so a snapshot can be written while new appends go
+    to a fresh segment. Sealed segments are discarded once a snapshot
+    containing them is safely on disk.
+
+    Several workers may share one log; they must serialize appends and
+    rotations (faiss_manager holds its inter-process lock for both).
+
+    A read position is a dict {segment inode: bytes applied}: inodes
+    survive rotate() (a rename), so a worker can resume replay where it
+    stopped even after another worker sealed the segment.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    # -------------------------------------------------
+    # Writing
+    # -------------------------------------------------
+
+    def _append(self, op, ids, vectors=None):
+
+        ids = np.ascontiguousarray(ids, dtype="int64")
+        payload = ids.tobytes()
+        dimension = 0
+
+        if vectors is not None:
+            vectors = np.ascontiguousarray(vectors, dtype="float32")
+            dimension = vectors.shape[1]
+            payload += vectors.tobytes()
+
+        record = RECORD_HEADER.pack(op, len(ids), dimension, zlib.crc32(payload)) + payload
+
+        with self._lock:
+            if self._file is not None and self._replaced():
+                self._file.close()
+                self._file = None
+
+            if self._file is None:
+                self._file = open(self.path, "ab")
+
+            self._file.write(record)
+            self._file.flush()
+
+            if VECTOR_WAL_FSYNC:
+                os.fsync(self._file.fileno())
+
+            # Read position just past this record
+            return {os.fstat(self._file.fileno()).st_ino: self._file.tell()}
+
+    def _replaced(self):
+        """Another worker rotated or cleared the active segment we have open."""
+
+        try:
+            return os.stat(self.path).st_ino != os.fstat(self._file.fileno()).st_ino
+        except FileNotFoundError:
+            return True
+
+    def append_add(self, ids, vectors):
+        if len(ids):
+            return self._append(OP_ADD, ids, vectors)
+
+    def append_delete(self, ids):
+        if len(ids):
+            return self._append(OP_DELETE, ids)
+
+    def rotate(self):
+        """
+        Seal the active segment. Returns the newest sealed sequence number
+        (None if there are no segments at all); everything up to it is
+        covered by a snapshot taken right now.
+        """
+
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+            newest = max(self._sealed_sequences(), default=None)
+
+            if not os.path.exists(self.path):
+                return newest
+
+            if os.path.getsize(self.path) == 0:
+                os.remove(self.path)
+                return newest
+
+            seq = (newest or 0) + 1
+            os.replace(self.path, f"{self.path}.{seq}")
+
+            return seq
+
+    def discard_sealed(self, up_to_seq):
+
+        for seq in self._sealed_sequences():
+            if seq <= up_to_seq:
+                os.remove(f"{self.path}.{seq}")
+
+    def clear(self):
+        """Drop every segment (the caller just wrote a full snapshot)."""
+
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+            for seq in self._sealed_sequences():
+                os.remove(f"{self.path}.{seq}")
+
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    # -------------------------------------------------
+    # Reading / replay
+    # -------------------------------------------------
+
+    def _sealed_sequences(self):
+
+        sequences = []
+
+        for segment in glob.glob(glob.escape(self.path) + ".*"):
+            suffix = segment[len(self.path) + 1:]
+            if suffix.isdigit():
+                sequences.append(int(suffix))
+
+        return sorted(sequences)
+
+    def segments(self):
+        """Sealed segments oldest first, then the active one."""
+
+        paths = [f"{self.path}.{seq}" for seq in self._sealed_sequences()]
+
+        if os.path.exists(self.path):
+            paths.append(self.path)
+
+        return paths
+
+    def records(self, position=None):
+        """
+        Yields (op, ids, vectors_or_None) in write order. A torn or
+        corrupt record (crash mid-append) ends its segment.
+
+        position: a read position (see class docstring) — records before
+        it are skipped, and it is advanced past every record yielded.
+        """
+
+        if position is None:
+            position = {}
+
+        for segment in self.segments():
+            segment_size = os.path.getsize(segment)
+
+            with open(segment, "rb") as f:
+                inode = os.fstat(f.fileno()).st_ino
+                f.seek(position.get(inode, 0))
+
+                while True:
+                    header = f.read(RECORD_HEADER.size)
+                    if not header:
+                        break
+
+                    valid = len(header) == RECORD_HEADER.size
+
+                    if valid:
+                        op, count, dimension, crc = RECORD_HEADER.unpack(header)
+                        payload_size = count * 8 + count * dimension * 4
+                        valid = (
+                            op in (OP_ADD, OP_DELETE)
+                            and payload_size <= segment_size - f.tell()
+                        )
+
+                    if valid:
+                        payload = f.read(payload_size)
+                        valid = zlib.crc32(payload) == crc
+
+                    if not valid:
+                        print(f"[FAISS] Ignoring torn record at the end of {segment}")
+                        break
+
+                    ids = np.frombuffer(payload[:count * 8], dtype="int64")
+                    vectors = None
+
+                    if op == OP_ADD:
+                        vectors = np.frombuffer(
+                            payload[count * 8:], dtype="float32"
+                        ).reshape(count, dimension)
+
+                    position[inode] = f.tell()
+                    yield op, ids, vectors
+
+    def size_bytes(self):
+        return sum(os.path.getsize(segment) for segment in self.segments())
+
+
+# =====================================================
+# ATOMIC SNAPSHOT WRITE
+# =====================================================
+
+def write_atomic(data, path):
+    """
+    Write bytes to `path.tmp`, fsync, then rename over `path` — readers
+    see either the old file or the complete new one, never a torn write.
+    """
+
+    temp_path = path + ".tmp"
+
+    with open(temp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(temp_path, path)
+
+    # Persist the rename itself
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
@@ -1,14 +1,26 @@
+import os
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from app.database import Base, engine
 from app.auth.routes import router as auth_router
-from app.document.routes import router as document_router
+from app.document.routes import (
+    router as document_router,
+    MAX_UPLOAD_REQUEST_BYTES,
+    MAX_BULK_UPLOAD_REQUEST_BYTES,
+)
 from app.chat.routes import router as chat_router
 from app.auth.dependencies import admin_required, student_required
 from app.admin.routes import router as admin_router
 from app.admin.routes import router as admin_router
 from app.models import scrape_source
 from app.services.scheduler import start_scheduler
+from app.services.ingestion_queue import start_ingestion_workers
+from app.document.embedder import warm_up
+from app.document.faiss_manager import start_index_snapshots, snapshot_index
+from app.utils.request_limits import RequestSizeLimitMiddleware
+
+# Load the embedding model at startup instead of on the first request
+EMBEDDER_WARMUP_ON_STARTUP = os.getenv("EMBEDDER_WARMUP_ON_STARTUP", "1") == "1"
 
 # Create tables
 Base.metadata.create_all(bind=engine)
@@ -16,6 +28,16 @@ Base.metadata.create_all(bind=engine)
 # Create app ONCE
 app = FastAPI()
 
+# Upload size caps — applied while the body arrives, before Starlette
+# spools it to disk (added before CORS so 413s still carry CORS headers)
+app.add_middleware(
+    RequestSizeLimitMiddleware,
+    limits={
+        "/document/upload": MAX_UPLOAD_REQUEST_BYTES,
+        "/document/upload-bulk": MAX_BULK_UPLOAD_REQUEST_BYTES,
+    },
+)
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -53,4 +75,15 @@ def student_test(user=Depends(student_required)):
 
 @app.on_event("startup")
 def startup_event():
-    start_scheduler()
\ No newline at end of file
+    if EMBEDDER_WARMUP_ON_STARTUP:
+        warm_up()
+
+    start_scheduler()
+    start_ingestion_workers()
+    start_index_snapshots()
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    # Fold the vector log into a snapshot so the next start replays nothing
+    snapshot_index()
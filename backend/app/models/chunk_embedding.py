@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, LargeBinary, DateTime, UniqueConstraint
+from datetime import datetime
+from app.database import Base
+
+
+class ChunkEmbedding(Base):
+    __tablename__ = "chunk_embeddings"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    text_hash = Column(String(64), index=True)  # sha256 of chunk text
+    model_name = Column(String)
+
+    vector = Column(LargeBinary)  # float32 bytes
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("text_hash", "model_name", name="uq_chunk_embedding"),
+    )
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, Float, Boolean, DateTime, ForeignKey
+from datetime import datetime
+from app.database import Base
+
+
+class ExtractionStat(Base):
+    __tablename__ = "extraction_stats"
+
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), index=True)
+
+    pages_total = Column(Integer, default=0)
+    pages_text = Column(Integer, default=0)   # kept from pdfplumber
+    pages_ocr = Column(Integer, default=0)    # re-read with OCR
+    ocr_seconds = Column(Float, default=0.0)
+    used_ghostscript = Column(Boolean, default=False)
+    ghostscript_seconds = Column(Float, default=0.0)  # render + OCR
+    cache_hit = Column(Boolean, default=False)  # served from extraction cache
+
+    created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from datetime import datetime
+from app.database import Base
+
+
+class IngestionJob(Base):
+    __tablename__ = "ingestion_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), index=True)
+
+    # "document" (single upload) or "bulk" (document_ids holds a JSON list)
+    kind = Column(String, default="document")
+    document_ids = Column(Text, nullable=True)
+
+    # queued → running → done / failed
+    status = Column(String, default="queued", index=True)
+    stage = Column(String, default="queued")
+
+    stage_timings = Column(Text, nullable=True)  # JSON: {stage: seconds}
+    result = Column(Text, nullable=True)         # JSON summary from the pipeline
+    error = Column(Text, nullable=True)
+
+    attempts = Column(Integer, default=0)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
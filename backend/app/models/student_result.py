@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Index
+from app.database import Base
+
+
+class StudentResult(Base):
+    __tablename__ = "student_results"
+
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), index=True)
+    chunk_id = Column(Integer, ForeignKey("document_chunks.id"), nullable=True, index=True)
+
+    name = Column(String)
+    name_normalized = Column(String, index=True)  # lowercase, single spaces
+
+    semester_label = Column(String)               # as printed ("V", "5", ...)
+    semester = Column(Integer, nullable=True, index=True)
+
+    sgpi = Column(Float, nullable=True, index=True)
+    total_marks = Column(Integer, nullable=True)
+    result = Column(String, index=True)           # Pass / Fail
+
+
+class SubjectMark(Base):
+    __tablename__ = "subject_marks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    student_result_id = Column(Integer, ForeignKey("student_results.id"), index=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), index=True)
+
+    semester = Column(Integer, nullable=True)
+    subject_code = Column(String)
+    marks = Column(Integer)
+
+    __table_args__ = (
+        Index("ix_subject_marks_code_marks", "subject_code", "marks"),
+        Index("ix_subject_marks_code_semester", "subject_code", "semester"),
+    )
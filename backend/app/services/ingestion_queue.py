@@ -0,0 +1,353 @@
+import os
+import json
+import time
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from app.database import SessionLocal
+from app.models.document import Document
+from app.models.ingestion_job import IngestionJob
+from app.document.processing import process_document, reprocess_document
+from app.document.bulk import ingest_documents_bulk
+
+
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", "2"))
+INGESTION_POLL_SECONDS = float(os.getenv("INGESTION_POLL_SECONDS", "5"))
+
+# A running job whose heartbeat is older than this was lost (crash/restart)
+INGESTION_STALE_SECONDS = int(os.getenv("INGESTION_STALE_SECONDS", "120"))
+INGESTION_MAX_ATTEMPTS = 3
+
+
+_wakeup = threading.Event()
+_slots = threading.Semaphore(INGESTION_WORKERS)
+
+_running_ids = set()
+_running_lock = threading.Lock()
+
+_executor = None
+_dispatcher = None
+_start_lock = threading.Lock()
+
+
+# =====================================================
+# ENQUEUE
+# =====================================================
+
+def enqueue_ingestion(db, document_id):
+
+    job = IngestionJob(
+        document_id=document_id,
+        status="queued",
+        stage="queued",
+    )
+
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    _wakeup.set()
+
+    return job
+
+
+def enqueue_bulk_ingestion(db, document_ids):
+
+    job = IngestionJob(
+        kind="bulk",
+        document_ids=json.dumps(document_ids),
+        status="queued",
+        stage="queued",
+    )
+
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    _wakeup.set()
+
+    return job
+
+
+def job_to_dict(job):
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "document_id": job.document_id,
+        "document_ids": json.loads(job.document_ids) if job.document_ids else None,
+        "status": job.status,
+        "stage": job.stage,
+        "stage_timings": json.loads(job.stage_timings) if job.stage_timings else {},
+        "result": json.loads(job.result) if job.result else None,
+        "error": job.error,
+        "attempts": job.attempts,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+# =====================================================
+# CLAIM / HEARTBEAT / RECOVERY
+# =====================================================
+
+def _claim_next_job():
+
+    db = SessionLocal()
+
+    try:
+        candidates = db.query(IngestionJob.id).filter(
+            IngestionJob.status == "queued"
+        ).order_by(IngestionJob.id).limit(10).all()
+
+        for (job_id,) in candidates:
+            now = datetime.utcnow()
+
+            # Conditional update: only one worker/process can win the job
+            claimed = db.query(IngestionJob).filter(
+                IngestionJob.id == job_id,
+                IngestionJob.status == "queued"
+            ).update({
+                "status": "running",
+                "started_at": now,
+                "heartbeat_at": now,
+                "attempts": IngestionJob.attempts + 1,
+            }, synchronize_session=False)
+
+            db.commit()
+
+            if claimed:
+                return job_id
+
+        return None
+
+    finally:
+        db.close()
+
+
+def _heartbeat():
+
+    with _running_lock:
+        job_ids = list(_running_ids)
+
+    if not job_ids:
+        return
+
+    db = SessionLocal()
+
+    try:
+        db.query(IngestionJob).filter(
+            IngestionJob.id.in_(job_ids)
+        ).update({"heartbeat_at": datetime.utcnow()}, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _recover_stale_jobs():
+
+    cutoff = datetime.utcnow() - timedelta(seconds=INGESTION_STALE_SECONDS)
+
+    db = SessionLocal()
+
+    try:
+        stale_jobs = db.query(IngestionJob).filter(
+            IngestionJob.status == "running",
+            IngestionJob.heartbeat_at < cutoff
+        ).all()
+
+        for job in stale_jobs:
+            if job.attempts >= INGESTION_MAX_ATTEMPTS:
+                job.status = "failed"
+                job.error = f"Gave up after {job.attempts} interrupted attempts"
+                job.finished_at = datetime.utcnow()
+            else:
+                print(f"[INGEST] Requeueing interrupted job {job.id}")
+                job.status = "queued"
+                job.stage = "queued"
+
+        db.commit()
+
+    finally:
+        db.close()
+
+
+def _update_job(job_id, **fields):
+
+    db = SessionLocal()
+
+    try:
+        db.query(IngestionJob).filter(
+            IngestionJob.id == job_id
+        ).update(fields, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+# =====================================================
+# RUN A SINGLE JOB
+# =====================================================
+
+def _run_job(job_id):
+
+    with _running_lock:
+        _running_ids.add(job_id)
+
+    timings = {}
+    current = {"stage": None, "started": None}
+
+    def close_stage():
+        if current["stage"] is not None:
+            timings[current["stage"]] = round(
+                time.perf_counter() - current["started"], 3
+            )
+
+    def on_stage(stage):
+        close_stage()
+        current["stage"] = stage
+        current["started"] = time.perf_counter()
+
+        _update_job(
+            job_id,
+            stage=stage,
+            stage_timings=json.dumps(timings),
+            heartbeat_at=datetime.utcnow(),
+        )
+
+    try:
+        db = SessionLocal()
+
+        try:
+            job = db.query(IngestionJob).filter(IngestionJob.id == job_id).first()
+            kind = job.kind
+            attempts = job.attempts
+            bulk_ids = json.loads(job.document_ids) if job.document_ids else []
+            document = db.query(Document).filter(
+                Document.id == job.document_id
+            ).first()
+        finally:
+            db.close()
+
+        if kind == "bulk":
+            print(f"[INGEST] Job {job_id}: bulk of {len(bulk_ids)} (attempt {attempts})")
+
+            result = ingest_documents_bulk(bulk_ids, on_stage=on_stage)
+
+        else:
+            if not document:
+                raise ValueError("Document no longer exists")
+
+            print(f"[INGEST] Job {job_id}: {document.filename} (attempt {attempts})")
+
+            # A retry may find chunks from the interrupted attempt → diff instead
+            pipeline = process_document if attempts <= 1 else reprocess_document
+
+            result = pipeline(
+                document.file_path,
+                document.file_type,
+                document.id,
+                on_stage=on_stage
+            )
+
+        close_stage()
+
+        if result.get("status") == "success":
+            _update_job(
+                job_id,
+                status="done",
+                stage="done",
+                stage_timings=json.dumps(timings),
+                result=json.dumps(result),
+                finished_at=datetime.utcnow(),
+            )
+        else:
+            _update_job(
+                job_id,
+                status="failed",
+                stage_timings=json.dumps(timings),
+                error=result.get("message", "Unknown error"),
+                finished_at=datetime.utcnow(),
+            )
+
+        print(f"[INGEST] Job {job_id} finished: {result.get('status')} {timings}")
+
+    except Exception as e:
+        close_stage()
+        print(f"[INGEST] Job {job_id} crashed:", e)
+
+        _update_job(
+            job_id,
+            status="failed",
+            stage_timings=json.dumps(timings),
+            error=str(e),
+            finished_at=datetime.utcnow(),
+        )
+
+    finally:
+        with _running_lock:
+            _running_ids.discard(job_id)
+
+        _slots.release()
+
+
+# =====================================================
+# DISPATCHER
+# =====================================================
+
+def _dispatch_loop():
+
+    last_maintenance = 0.0
+
+    while True:
+        try:
+            if time.monotonic() - last_maintenance >= INGESTION_POLL_SECONDS:
+                _heartbeat()
+                _recover_stale_jobs()
+                last_maintenance = time.monotonic()
+
+            if not _slots.acquire(timeout=INGESTION_POLL_SECONDS):
+                continue
+
+            _wakeup.clear()
+
+            try:
+                job_id = _claim_next_job()
+            except Exception:
+                _slots.release()
+                raise
+
+            if job_id is None:
+                _slots.release()
+                _wakeup.wait(INGESTION_POLL_SECONDS)
+                continue
+
+            _executor.submit(_run_job, job_id)
+
+        except Exception as e:
+            print("[INGEST] Dispatcher error:", e)
+            time.sleep(INGESTION_POLL_SECONDS)
+
+
+def start_ingestion_workers():
+
+    global _executor, _dispatcher
+
+    with _start_lock:
+        if _dispatcher is not None:
+            return
+
+        _executor = ThreadPoolExecutor(
+            max_workers=INGESTION_WORKERS,
+            thread_name_prefix="ingest"
+        )
+
+        _dispatcher = threading.Thread(
+            target=_dispatch_loop,
+            name="ingest-dispatcher",
+            daemon=True
+        )
+        _dispatcher.start()
+
+    print(f"Ingestion workers started ({INGESTION_WORKERS}).")
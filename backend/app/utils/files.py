@@ -0,0 +1,68 @@
+import os
+import hashlib
+import tempfile
+
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_sha256(file_path, block_size=HASH_BLOCK_SIZE):
+
+    sha256 = hashlib.sha256()
+
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            sha256.update(block)
+
+    return sha256.hexdigest()
+
+
+# =====================================================
+# STREAMING WRITES (BOUNDED MEMORY)
+# =====================================================
+
+STREAM_BLOCK_SIZE = 1024 * 1024
+
+
+class FileTooLargeError(Exception):
+    pass
+
+
+def iter_file_blocks(fileobj, block_size=STREAM_BLOCK_SIZE):
+    return iter(lambda: fileobj.read(block_size), b"")
+
+
+def stream_to_temp_file(blocks, directory, max_bytes):
+    """
+    Write byte blocks to a temp file inside `directory` (same filesystem,
+    so the caller can os.replace() it into place), hashing on the way.
+    Returns (temp_path, sha256_hex, size). Aborts with FileTooLargeError
+    as soon as more than max_bytes arrive.
+    """
+
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+
+    sha256 = hashlib.sha256()
+    size = 0
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for block in blocks:
+                if not block:
+                    continue
+
+                size += len(block)
+                if size > max_bytes:
+                    raise FileTooLargeError(
+                        f"File exceeds the {max_bytes // (1024 * 1024)} MB limit"
+                    )
+
+                sha256.update(block)
+                f.write(block)
+
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+    return temp_path, sha256.hexdigest(), size
@@ -0,0 +1,42 @@
+import os
+
+
+def current_rss_mb():
+    """
+    Resident set size of this process in MB (None if unavailable).
+    """
+
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def current_memory_breakdown_mb():
+    """
+    RSS split into private anonymous memory and file-backed pages
+    (e.g. a memory-mapped index shared through the page cache).
+    Linux only; empty dict elsewhere.
+    """
+
+    fields = {"VmRSS": "rss", "RssAnon": "rss_anon", "RssFile": "rss_file"}
+    breakdown = {}
+
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in fields:
+                    breakdown[fields[key]] = round(int(value.split()[0]) / 1024, 1)
+    except (OSError, ValueError):
+        return {}
+
+    return breakdown
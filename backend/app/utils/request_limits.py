@@ -0,0 +1,95 @@
+import json
+
+
+# =====================================================
+# REQUEST BODY SIZE LIMIT (BEFORE STARLETTE SPOOLS IT)
+# =====================================================
+
+class RequestTooLargeError(Exception):
+    pass
+
+
+class RequestSizeLimitMiddleware:
+    """
+    ASGI middleware capping the request body of selected paths.
+
+    By the time a route sees an UploadFile, Starlette has already spooled
+    the whole body to disk, so the cap has to apply here: a declared
+    Content-Length over the limit is refused without reading anything,
+    and a chunked body is cut off as soon as the running total passes it.
+    Either way the client gets a 413.
+    """
+
+    def __init__(self, app, limits):
+        self.app = app
+        self.limits = dict(limits)  # exact path → max body bytes
+
+    async def __call__(self, scope, receive, send):
+
+        max_bytes = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+
+        if max_bytes is None:
+            await self.app(scope, receive, send)
+            return
+
+        declared = dict(scope["headers"]).get(b"content-length")
+
+        if declared is not None and declared.isdigit() and int(declared) > max_bytes:
+            await _send_too_large(send, max_bytes)
+            return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive():
+
+            nonlocal received, exceeded
+
+            message = await receive()
+
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+
+                if received > max_bytes:
+                    exceeded = True
+                    raise RequestTooLargeError(f"Request body exceeds {max_bytes} bytes")
+
+            return message
+
+        async def guarded_send(message):
+
+            nonlocal response_started
+
+            # The route turns the aborted body into its own error — answer 413 instead
+            if exceeded:
+                return
+
+            response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except RequestTooLargeError:
+            pass
+
+        if exceeded and not response_started:
+            await _send_too_large(send, max_bytes)
+
+
+async def _send_too_large(send, max_bytes):
+
+    body = json.dumps({
+        "detail": f"Request exceeds the {max_bytes // (1024 * 1024)} MB limit"
+    }).encode()
+
+    await send({
+        "type": "http.response.start",
+        "status": 413,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"connection", b"close"),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,150 @@
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+
+# Log any single wait longer than this (contention during scrapes/uploads)
+SLOW_WAIT_MS = 100
+
+
+class ReadWriteLock:
+    """
+    Many concurrent readers or one writer. Writer-preferring: once a
+    writer is waiting, new readers queue behind it so a steady stream of
+    searches cannot starve an upload. Not reentrant.
+
+    Wait times (time from asking for the lock to getting it) are kept per
+    mode for get_stats().
+    """
+
+    def __init__(self, name, sample_size=2000):
+        self.name = name
+
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+        self._stats_lock = threading.Lock()
+        self._waits_ms = {
+            "read": deque(maxlen=sample_size),
+            "write": deque(maxlen=sample_size),
+        }
+        self._counts = {"read": 0, "write": 0}
+        self._contended = {"read": 0, "write": 0}
+        self._hold_ms = deque(maxlen=sample_size)  # writers only
+
+    # -------------------------------------------------
+    # Acquire / release
+    # -------------------------------------------------
+
+    def acquire_read(self):
+
+        start = time.perf_counter()
+
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+
+        self._record("read", start)
+
+    def release_read(self):
+
+        with self._cond:
+            self._readers -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+
+        start = time.perf_counter()
+
+        with self._cond:
+            self._writers_waiting += 1
+            try:
+                while self._writer or self._readers:
+                    self._cond.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = True
+
+        self._record("write", start)
+
+    def release_write(self):
+
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+    @contextmanager
+    def read(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        self.acquire_write()
+        held_from = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release_write()
+            with self._stats_lock:
+                self._hold_ms.append((time.perf_counter() - held_from) * 1000)
+
+    # -------------------------------------------------
+    # Instrumentation
+    # -------------------------------------------------
+
+    def _record(self, mode, start):
+
+        waited_ms = (time.perf_counter() - start) * 1000
+
+        with self._stats_lock:
+            self._counts[mode] += 1
+            self._waits_ms[mode].append(waited_ms)
+            if waited_ms >= 1:
+                self._contended[mode] += 1
+
+        if waited_ms >= SLOW_WAIT_MS:
+            print(f"[LOCK] {self.name}: {mode} waited {waited_ms:.0f} ms")
+
+    def get_stats(self):
+
+        def summarize(samples):
+            samples = sorted(samples)
+
+            def percentile(p):
+                if not samples:
+                    return None
+                return round(samples[min(len(samples) - 1, int(len(samples) * p))], 3)
+
+            return {
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": round(samples[-1], 3) if samples else None,
+            }
+
+        with self._stats_lock:
+            stats = {
+                mode: {
+                    "acquired": self._counts[mode],
+                    "contended": self._contended[mode],  # waited >= 1 ms
+                    "wait_ms": summarize(self._waits_ms[mode]),
+                }
+                for mode in ("read", "write")
+            }
+            stats["write"]["hold_ms"] = summarize(self._hold_ms)
+
+        with self._cond:
+            stats["active_readers"] = self._readers
+            stats["writer_active"] = self._writer
+            stats["writers_waiting"] = self._writers_waiting
+
+        return stats
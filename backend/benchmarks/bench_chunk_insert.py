@@ -0,0 +1,131 @@
+"""
+Chunk persistence on SQLite: per-row flush + N+1 vector_id updates
+(the old upload path) vs. bulk_insert_chunks().
+
+    cd backend
+    python -m benchmarks.bench_chunk_insert --chunks 2000 --repeat 3
+"""
+
+import os
+import time
+import argparse
+import tempfile
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import user, document, chunk  # noqa: F401  (register tables)
+from app.models.chunk import DocumentChunk
+from app.models.document import Document
+from app.document.processing import bulk_insert_chunks
+
+
+def make_session(db_path):
+
+    engine = create_engine(
+        f"sqlite:///{db_path}",
+        connect_args={"check_same_thread": False}
+    )
+
+    statements = {"count": 0}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_statements(*args):
+        statements["count"] += 1
+
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    return Session(), statements
+
+
+def fake_chunks(n):
+    return [
+        f"Student Name: STUDENT {i}\nSemester: V\nOverall Result: Pass\n"
+        f"Total Marks Obtained: {400 + i % 300}\nSGPI: {6 + (i % 40) / 10:.2f}"
+        for i in range(n)
+    ]
+
+
+def legacy_insert(db, document_id, chunks):
+
+    chunk_ids = []
+
+    for i, chunk_text_value in enumerate(chunks):
+        db_chunk = DocumentChunk(
+            document_id=document_id,
+            chunk_text=chunk_text_value,
+            chunk_index=i,
+        )
+        db.add(db_chunk)
+        db.flush()
+        chunk_ids.append(db_chunk.id)
+
+    db.commit()
+
+    for cid in chunk_ids:
+        db_chunk = db.get(DocumentChunk, cid)
+        db_chunk.vector_id = cid
+
+    db.commit()
+
+    return chunk_ids
+
+
+def bulk_insert(db, document_id, chunks):
+    chunk_ids = bulk_insert_chunks(db, document_id, list(enumerate(chunks)))
+    db.commit()
+    return chunk_ids
+
+
+def run(strategy, chunks):
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db, statements = make_session(os.path.join(tmp, "bench.db"))
+
+        doc = Document(filename="bench.pdf", file_hash="bench", semester=5)
+        db.add(doc)
+        db.commit()
+
+        statements["count"] = 0
+        start = time.perf_counter()
+
+        chunk_ids = strategy(db, doc.id, chunks)
+
+        elapsed = time.perf_counter() - start
+
+        missing = db.query(DocumentChunk).filter(
+            DocumentChunk.vector_id.is_(None)
+        ).count()
+        assert len(chunk_ids) == len(chunks) and missing == 0
+
+        db.close()
+
+        return elapsed, statements["count"]
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    chunks = fake_chunks(args.chunks)
+
+    print(f"{args.chunks} chunks, best of {args.repeat}")
+
+    results = {}
+    for name, strategy in [("per-row flush + N+1", legacy_insert), ("bulk", bulk_insert)]:
+        runs = [run(strategy, chunks) for _ in range(args.repeat)]
+        best, statements = min(runs)
+        results[name] = best
+        print(f"  {name:<22} {best * 1000:9.1f} ms  {statements:6d} statements")
+
+    speedup = results["per-row flush + N+1"] / results["bulk"]
+    print(f"  speedup: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Filtered retrieval (semester / subject filters in search.py): the old
+path vs. filter pushdown.
+
+  DB side:    query(DocumentChunk).all() (rows with chunk_text) vs.
+              query(DocumentChunk.id) (IDs only)
+  FAISS side: search top_k * 10 then drop IDs outside the filter vs.
+              search_allowed() with an IDSelector (exact within the set)
+
+Recall is against an exact search restricted to the allowed IDs;
+"empty" is the share of queries that returned nothing and fell back to
+unfiltered results.
+
+    cd backend
+    python -m benchmarks.bench_filtered_search --vectors 200000 --type flat
+"""
+
+import os
+import time
+import argparse
+import tempfile
+
+import faiss
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import user, document, chunk  # noqa: F401  (register tables)
+from app.models.chunk import DocumentChunk
+from app.models.document import Document
+from app.document.ann_index import INDEX_TYPES, build_index, search_allowed
+
+
+TOP_K = 8
+SEMESTERS = 8
+
+
+# =====================================================
+# DB: rows vs IDs
+# =====================================================
+
+def bench_db(num_chunks, chunk_chars):
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+
+        documents = [Document(filename=f"sem{s}.pdf", file_hash=f"h{s}", semester=s)
+                     for s in range(1, SEMESTERS + 1)]
+        db.add_all(documents)
+        db.commit()
+
+        text = "x" * chunk_chars
+        db.execute(
+            DocumentChunk.__table__.insert(),
+            [
+                {"document_id": documents[i % SEMESTERS].id, "chunk_text": text, "chunk_index": i}
+                for i in range(num_chunks)
+            ]
+        )
+        db.commit()
+
+        def rows():
+            return {c.id for c in db.query(DocumentChunk).join(Document).filter(Document.semester == 3).all()}
+
+        def ids():
+            return {i for (i,) in db.query(DocumentChunk.id).join(Document).filter(Document.semester == 3).all()}
+
+        print(f"\nDB filter (semester = 3 of {SEMESTERS}, {num_chunks} chunks of {chunk_chars} chars)")
+
+        for name, load in [("full rows", rows), ("ids only", ids)]:
+            timings = []
+            for _ in range(3):
+                db.expunge_all()
+                start = time.perf_counter()
+                loaded = load()
+                timings.append(time.perf_counter() - start)
+
+            print(f"  {name:<10} {min(timings) * 1000:8.1f} ms  {len(loaded)} ids  (best of 3)")
+
+        db.close()
+
+
+# =====================================================
+# FAISS: post-filter vs pushdown
+# =====================================================
+
+def recall(found, truth):
+    hits = sum(len(set(f[f >= 0]) & set(t[t >= 0])) for f, t in zip(found, truth))
+    return hits / max(1, sum(int((t >= 0).sum()) for t in truth))
+
+
+def post_filter(index, queries, allowed):
+
+    _, found = index.search(queries, TOP_K * 10)
+
+    results = np.full((len(queries), TOP_K), -1, dtype="int64")
+    for row, candidates in enumerate(found):
+        kept = [i for i in candidates if i in allowed][:TOP_K]
+        results[row, :len(kept)] = kept
+
+    return results
+
+
+def bench_faiss(num_vectors, index_type, num_queries, fractions):
+
+    rng = np.random.default_rng(0)
+    vectors = rng.random((num_vectors, 384), dtype="float32")
+    ids = np.arange(num_vectors, dtype="int64")
+    queries = rng.random((num_queries, 384), dtype="float32")
+
+    start = time.perf_counter()
+    index = build_index(vectors, ids, index_type)
+    print(f"\n{index_type} index over {num_vectors} vectors (built in {time.perf_counter() - start:.1f}s), "
+          f"top_k={TOP_K}, {num_queries} queries\n")
+
+    print(f"  {'allowed':>8} {'method':<12} {'recall':>7} {'empty':>6} {'ms/query':>9}")
+
+    for fraction in fractions:
+        allowed = set(rng.choice(num_vectors, max(1, int(num_vectors * fraction)), replace=False).tolist())
+
+        allowed_ids = np.fromiter(allowed, dtype="int64")
+        _, truth = faiss.knn(queries, vectors[allowed_ids], TOP_K)
+        truth = np.where(truth >= 0, allowed_ids[truth], -1)
+
+        methods = [
+            ("post-filter", lambda q: post_filter(index, q, allowed)),
+            ("pushdown", lambda q: search_allowed(index, q, TOP_K, allowed)[1]),
+        ]
+
+        for name, method in methods:
+            found = []
+            start = time.perf_counter()
+            for query in queries:
+                found.append(method(query.reshape(1, -1))[0])
+            elapsed_ms = (time.perf_counter() - start) * 1000 / num_queries
+
+            found = np.array(found)
+            empty = float(np.mean((found < 0).all(axis=1)))
+
+            print(f"  {len(allowed):>8} {name:<12} {recall(found, truth):7.3f} {empty:6.2f} {elapsed_ms:9.3f}")
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vectors", type=int, default=200000)
+    parser.add_argument("--type", choices=INDEX_TYPES, default="flat")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--fractions", type=float, nargs="+", default=[0.001, 0.01, 0.125, 0.5])
+    parser.add_argument("--chunk-chars", type=int, default=1200)
+    args = parser.parse_args()
+
+    bench_db(args.vectors, args.chunk_chars)
+    bench_faiss(args.vectors, args.type, args.queries, args.fractions)
+
+
+if __name__ == "__main__":
+    main()
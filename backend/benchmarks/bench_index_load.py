@@ -0,0 +1,110 @@
+"""
+Index startup time and memory with FAISS_MMAP off vs on. Each mode
+loads faiss_manager in a fresh process (as a uvicorn worker would),
+runs a few searches, and reports private (anonymous) vs file-backed
+RSS. File-backed pages of a mapped index are shared between workers.
+
+    cd backend
+    python -m benchmarks.bench_index_load --vectors 200000 --workers 4
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+import faiss
+import numpy as np
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import json, time
+import numpy as np
+from app.utils.metrics import current_memory_breakdown_mb
+
+start = time.perf_counter()
+from app.document import faiss_manager
+imported = time.perf_counter() - start
+
+queries = np.random.default_rng(1).random((20, faiss_manager.dimension)).astype("float32")
+for query in queries:
+    faiss_manager.get_index().search(query.reshape(1, -1), 8)
+
+print(json.dumps({
+    "import_s": imported,
+    "index_load_s": faiss_manager.load_stats["load_seconds"],
+    "memory": current_memory_breakdown_mb(),
+}))
+"""
+
+
+def write_index(directory, vectors):
+
+    rng = np.random.default_rng(0)
+    index = faiss.IndexIDMap(faiss.IndexFlatL2(384))
+
+    for start in range(0, vectors, 50000):
+        batch = min(50000, vectors - start)
+        index.add_with_ids(
+            rng.random((batch, 384), dtype="float32"),
+            np.arange(start, start + batch, dtype="int64")
+        )
+
+    faiss.write_index(index, os.path.join(directory, "faiss.index"))
+
+
+def load_in_child(directory, mmap):
+
+    env = dict(os.environ)
+    env["FAISS_MMAP"] = "1" if mmap else "0"
+    env["PYTHONPATH"] = BACKEND_DIR + os.pathsep + env.get("PYTHONPATH", "")
+
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        cwd=directory,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vectors", type=int, default=200000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_index(directory, args.vectors)
+        size_mb = os.path.getsize(os.path.join(directory, "faiss.index")) / (1024 * 1024)
+
+        print(f"{args.vectors} vectors, index file {size_mb:.0f} MB\n")
+        print(f"  {'mode':<8} {'load ms':>9} {'RSS MB':>8} {'private':>8} {'file':>8} "
+              f"{'private x' + str(args.workers):>12}")
+
+        for mmap in (False, True):
+            result = load_in_child(directory, mmap)
+            memory = result["memory"]
+
+            print(
+                f"  {'mmap' if mmap else 'memory':<8} "
+                f"{result['index_load_s'] * 1000:9.1f} "
+                f"{memory.get('rss', 0):8.1f} "
+                f"{memory.get('rss_anon', 0):8.1f} "
+                f"{memory.get('rss_file', 0):8.1f} "
+                f"{memory.get('rss_anon', 0) * args.workers:12.1f}"
+            )
+
+        print("\n  'file' pages come from the page cache and are shared by every worker.")
+
+
+if __name__ == "__main__":
+    main()
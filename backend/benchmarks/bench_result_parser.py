@@ -0,0 +1,137 @@
+"""
+Result-ledger parsing: the original backward-scanning chunk_result_document
+vs. the single-pass parser, on a synthetic ledger. Also checks that both
+produce identical chunks.
+
+    cd backend
+    python -m benchmarks.bench_result_parser --students 5000
+"""
+
+import re
+import time
+import random
+import argparse
+
+from app.document.processing import chunk_result_document
+
+
+SUBJECTS = ["CSC501", "CSC502", "CSC503", "CSDLO5011", "CSL501", "CSL502", "CSM501"]
+
+
+def legacy_chunk_result_document(text):
+
+    lines = [line.strip() for line in text.split("\n") if line.strip()]
+    chunks = []
+
+    semester = "Unknown"
+    sem_match = re.search(r"Semester\s*[- ]?\s*(\w+)", text, re.IGNORECASE)
+    if sem_match:
+        semester = sem_match.group(1)
+
+    for i, line in enumerate(lines):
+
+        if "--" in line or re.search(r"\bPass\b|\bFail\b", line, re.IGNORECASE):
+
+            name = line.split("--")[0].strip()
+
+            result = "Pass"
+            if "FAIL" in line.upper():
+                result = "Fail"
+
+            total_marks = "Unknown"
+            sgpi = "Unknown"
+            subjects = {}
+
+            sgpi_match = re.search(r"\b\d+\.\d+\b", line)
+            if sgpi_match:
+                sgpi = sgpi_match.group(0)
+
+            for j in range(i - 1, max(i - 40, 0), -1):
+                if "MarksO" in lines[j] or "TOTAL" in lines[j].upper():
+                    numbers = re.findall(r"\b\d{2,4}\b", lines[j])
+                    if numbers:
+                        total_marks = numbers[-1]
+                    break
+
+            for j in range(i - 1, max(i - 30, 0), -1):
+                subject_match = re.match(r"([A-Z]{2,6}\d{3,4})", lines[j])
+                if subject_match:
+                    subject_code = subject_match.group(1)
+                    numbers = re.findall(r"\b\d{2,3}\b", lines[j])
+                    if numbers:
+                        subjects[subject_code] = numbers[-1]
+
+            chunk = f"""
+Student Name: {name}
+Semester: {semester}
+Overall Result: {result}
+Total Marks Obtained: {total_marks}
+SGPI: {sgpi}
+
+Subject Performance:
+"""
+
+            for code, marks in subjects.items():
+                chunk += f"- {code}: {marks} marks\n"
+
+            chunks.append(chunk.strip())
+
+    return chunks
+
+
+def synthetic_ledger(students, seed=7):
+
+    rng = random.Random(seed)
+    lines = ["UNIVERSITY OF MUMBAI", "Result Ledger Semester - V (CBCGS)", ""]
+
+    for s in range(students):
+        lines.append(f"Seat No {1000000 + s}")
+        for code in rng.sample(SUBJECTS, 6):
+            marks = [rng.randint(20, 80) for _ in range(3)]
+            lines.append(f"{code} {marks[0]} {marks[1]} {marks[2]} {sum(marks)}")
+        lines.append(f"MarksO {rng.randint(300, 700)} / 800")
+
+        failed = rng.random() < 0.1
+        lines.append(
+            f"STUDENT NAME {s} -- {'F' if failed else 'P'} "
+            f"{rng.uniform(4, 10):.2f} {'FAIL' if failed else 'PASS'}"
+        )
+
+    return "\n".join(lines)
+
+
+def best_time(func, text, repeat):
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = func(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, output
+
+
+def main():
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    text = synthetic_ledger(args.students)
+    line_count = text.count("\n") + 1
+
+    legacy_time, legacy_chunks = best_time(legacy_chunk_result_document, text, args.repeat)
+    new_time, new_chunks = best_time(chunk_result_document, text, args.repeat)
+
+    assert new_chunks == legacy_chunks, "Parsers disagree"
+
+    print(f"{args.students} students, {line_count} lines, {len(new_chunks)} chunks (identical)")
+    print(f"  backward scan  {legacy_time * 1000:9.1f} ms")
+    print(f"  single pass    {new_time * 1000:9.1f} ms")
+    print(f"  speedup: {legacy_time / new_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import user, document, chunk, student_result  # noqa: F401  (register tables)
+
+
+@pytest.fixture
+def db():
+    """Empty in-memory database with every table created; tests seed their own rows."""
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+
+    yield session
+
+    session.close()
+    engine.dispose()
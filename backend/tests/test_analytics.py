@@ -0,0 +1,186 @@
+import pytest
+
+from app.models.document import Document
+from app.models.student_result import StudentResult, SubjectMark
+from app.chat.analytics import answer_result_analytics, detect_analytics_intent
+
+
+# name → (sgpi, result, CSC501 marks); semester V ledger
+STUDENTS = {
+    "Asha Patil": (8.4, "Pass", 78),
+    "Rahul Desai": (7.95, "Pass", 71),
+    "Meera Shah": (7.95, "Pass", 65),
+    "Kiran Rao": (7.95, "Pass", 69),
+    "Vikram Joshi": (7.2, "Pass", 58),
+    "Nikhil Verma": (None, "Fail", 21),
+}
+
+
+def _add_student(db, document_id, name, sgpi, result, marks):
+
+    row = StudentResult(
+        document_id=document_id,
+        name=name,
+        name_normalized=name.lower(),
+        semester_label="V",
+        semester=5,
+        sgpi=sgpi,
+        result=result,
+    )
+    db.add(row)
+    db.flush()
+
+    db.add(SubjectMark(
+        student_result_id=row.id,
+        document_id=document_id,
+        semester=5,
+        subject_code="CSC501",
+        marks=marks,
+    ))
+
+
+@pytest.fixture
+def results(db):
+
+    db.add_all([
+        Document(id=1, filename="sem5_ledger.pdf"),
+        Document(id=2, filename="sem5_ledger_copy.pdf"),
+    ])
+
+    for name, (sgpi, result, marks) in STUDENTS.items():
+        _add_student(db, 1, name, sgpi, result, marks)
+
+    # The same ledger uploaded twice must not count anybody twice
+    _add_student(db, 2, "Asha Patil", *STUDENTS["Asha Patil"])
+
+    db.commit()
+
+    return db
+
+
+@pytest.mark.parametrize("question, intent", [
+    ("pass percentage in sem 5", "pass_percentage"),
+    ("how many students failed in semester V", "fail_count"),
+    ("highest marks in CSC501", "highest"),
+    ("toppers of sem 5", "highest"),
+    ("lowest sgpi in sem 5", "lowest"),
+    ("average sgpi", "average"),
+    ("students with sgpi above 8", "threshold"),
+])
+def test_detect_analytics_intent(question, intent):
+
+    assert detect_analytics_intent(question)[0] == intent
+
+
+@pytest.mark.parametrize("question", [
+    "top events this week",
+    "did asha patil fail",
+    "what is the syllabus of CSC501",
+])
+def test_detect_analytics_intent_ignores_other_questions(question):
+
+    assert detect_analytics_intent(question) is None
+
+
+def test_question_semester_and_subject():
+
+    _, params = detect_analytics_intent("highest marks in csc501 sem V")
+
+    assert params["semester"] == 5
+    assert params["subject_code"] == "CSC501"
+    assert params["metric"] == "subject"
+
+
+def test_pass_percentage_counts_each_student_once(results):
+
+    answer = answer_result_analytics(results, "pass percentage in sem 5")
+
+    assert "- Students: 6\n" in answer["context"]
+    assert "- Failed: 1\n" in answer["context"]
+    assert "- Pass percentage: 83.33%" in answer["context"]
+    assert sorted(answer["sources"]) == ["sem5_ledger.pdf", "sem5_ledger_copy.pdf"]
+
+
+def test_fail_count_lists_failed_students(results):
+
+    answer = answer_result_analytics(results, "how many students failed in sem 5")
+
+    assert "- Failed: 1 of 6 students" in answer["context"]
+    assert "- Nikhil Verma" in answer["context"]
+
+
+def test_highest_subject_marks(results):
+
+    answer = answer_result_analytics(results, "highest marks in CSC501")
+
+    first = answer["context"].split("\n")[2]
+
+    assert first == "- Asha Patil — 78"
+
+
+def test_average_skips_missing_values(results):
+
+    answer = answer_result_analytics(results, "average sgpi in sem 5")
+
+    assert "Average SGPI (semester 5): 7.89 (over 5 students)" in answer["context"]
+
+
+def test_threshold_count(results):
+
+    answer = answer_result_analytics(results, "students with sgpi above 7.5")
+
+    assert ": 4\n" in answer["context"]
+    assert "- Vikram Joshi" not in answer["context"]
+
+
+def test_no_structured_data(db):
+
+    assert answer_result_analytics(db, "pass percentage in sem 5") is None
+
+
+@pytest.mark.parametrize("question, direction, inclusive", [
+    ("students with sgpi above 7.95", "above", False),
+    ("students with sgpi at least 7.95", "above", True),
+    ("students with sgpi no less than 7.95", "above", True),
+    ("students with sgpi below 7.95", "below", False),
+    ("students with sgpi at most 7.95", "below", True),
+    ("students with sgpi no more than 7.95", "below", True),
+])
+def test_threshold_phrases(question, direction, inclusive):
+
+    intent, params = detect_analytics_intent(question)
+
+    assert intent == "threshold"
+    assert (params["direction"], params["inclusive"]) == (direction, inclusive)
+    assert params["threshold"] == 7.95
+
+
+@pytest.mark.parametrize("question, expected", [
+    ("students with sgpi above 7.95", 1),
+    ("students with sgpi at least 7.95", 4),
+    ("students with sgpi below 7.95", 1),
+    ("students with sgpi at most 7.95", 4),
+    ("students with sgpi no more than 7.95", 4),
+])
+def test_threshold_boundary(results, question, expected):
+
+    answer = answer_result_analytics(results, question)
+
+    assert answer["intent"] == "threshold"
+    assert f": {expected}\n" in answer["context"]
+
+
+@pytest.mark.parametrize("question", [
+    "students with sgpi above 7 in sem 7",   # nothing stored for semester 7
+    "students with marks in CSC701 above 40",
+])
+def test_threshold_without_data(results, question):
+
+    assert answer_result_analytics(results, question) is None
+
+
+def test_threshold_with_no_matches(results):
+
+    answer = answer_result_analytics(results, "students with sgpi above 9")
+
+    assert answer["context"].endswith(": 0")
@@ -0,0 +1,49 @@
+import io
+import zipfile
+from types import SimpleNamespace
+
+from fastapi import UploadFile
+
+from app.document import routes
+from app.models.document import Document
+
+
+def _zip(members):
+
+    buffer = io.BytesIO()
+
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+
+    buffer.seek(0)
+    return buffer
+
+
+def test_bulk_upload_keeps_same_named_zip_members(db, tmp_path, monkeypatch):
+
+    monkeypatch.setattr(routes, "UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(routes, "enqueue_bulk_ingestion", lambda db, ids: SimpleNamespace(id=1))
+
+    members = {
+        "sem1/result.pdf": b"%PDF-1.4 semester 1 ledger",
+        "sem2/result.pdf": b"%PDF-1.4 semester 2 ledger",
+    }
+
+    response = routes.upload_documents_bulk(
+        files=[UploadFile(file=_zip(members), filename="results.zip")],
+        user=SimpleNamespace(id=1),
+        db=db,
+    )
+
+    assert len(response["document_ids"]) == 2
+    assert response["skipped"] == []
+
+    documents = db.query(Document).order_by(Document.id).all()
+
+    assert [doc.filename for doc in documents] == ["result.pdf", "result.pdf"]
+    assert documents[0].file_path != documents[1].file_path
+
+    for doc, data in zip(documents, members.values()):
+        with open(doc.file_path, "rb") as f:
+            assert f.read() == data
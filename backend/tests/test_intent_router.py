@@ -0,0 +1,116 @@
+import pytest
+
+from app.models.document import Document
+from app.models.student_result import StudentResult, SubjectMark
+from app.chat.intent_router import _match_students, answer_direct_lookup
+
+
+# name → (sgpi, total marks, result, CSC501 marks); semester V ledger
+STUDENTS = {
+    "KHALID KHAN": (7.5, 512, "Pass", 66),
+    "RAHUL DESAI": (8.1, 540, "Pass", 72),
+    "RAHUL MEHTA": (6.9, 470, "Pass", 55),
+}
+
+
+def _add_student(db, document_id, name, sgpi, total_marks, result, marks):
+
+    row = StudentResult(
+        document_id=document_id,
+        name=name,
+        name_normalized=name.lower(),
+        semester_label="V",
+        semester=5,
+        sgpi=sgpi,
+        total_marks=total_marks,
+        result=result,
+    )
+    db.add(row)
+    db.flush()
+
+    db.add(SubjectMark(
+        student_result_id=row.id,
+        document_id=document_id,
+        semester=5,
+        subject_code="CSC501",
+        marks=marks,
+    ))
+
+
+@pytest.fixture
+def results(db):
+
+    db.add_all([
+        Document(id=1, filename="sem5_ledger.pdf"),
+        Document(id=2, filename="sem5_ledger_copy.pdf"),
+    ])
+
+    for name, values in STUDENTS.items():
+        _add_student(db, 1, name, *values)
+
+    # Same ledger uploaded twice: identical values, still one student
+    _add_student(db, 2, "KHALID KHAN", *STUDENTS["KHALID KHAN"])
+
+    db.commit()
+
+    return db
+
+
+def test_result_lookup(results):
+
+    answer = answer_direct_lookup(results, "result of khalid khan sem 5")
+
+    assert answer["answer"] == (
+        "Name: KHALID KHAN\n"
+        "Semester: V\n"
+        "SGPI: 7.5\n"
+        "Total Marks: 512\n"
+        "Result: Pass"
+    )
+    assert sorted(answer["sources"]) == ["sem5_ledger.pdf", "sem5_ledger_copy.pdf"]
+
+
+def test_subject_lookup(results):
+
+    answer = answer_direct_lookup(results, "marks of rahul desai in csc501")
+
+    assert answer["answer"] == (
+        "Name: RAHUL DESAI\n"
+        "Subject: CSC501\n"
+        "Marks: 72\n"
+        "Semester: V"
+    )
+
+
+@pytest.mark.parametrize("question", [
+    "result of rahul",                    # two students called Rahul
+    "result of khalid khan sem 6",        # no such semester
+    "result of nobody",
+    "what is the syllabus for sem 5",     # not a lookup at all
+])
+def test_falls_through_when_not_unambiguous(results, question):
+
+    assert answer_direct_lookup(results, question) is None
+
+
+def test_conflicting_values_fall_through(results):
+
+    _add_student(results, 2, "RAHUL DESAI", 7.0, 500, "Pass", 72)
+    results.commit()
+
+    assert answer_direct_lookup(results, "result of rahul desai") is None
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("khalid khan", "KHALID KHAN"),
+    ("desai", "RAHUL DESAI"),
+    ("rahul des", "RAHUL DESAI"),
+    ("kha", "KHALID KHAN"),
+    ("ali", None),      # inside "khalid", not at the start of a word
+    ("sai", None),
+])
+def test_match_students_only_from_word_start(results, name, expected):
+
+    rows = _match_students(results, name, None)
+
+    assert (rows[0].name if rows else None) == expected